@@ -1,11 +1,31 @@
 from pydantic import BaseModel, field_validator
 from typing import List, Optional
 
+from backend.app.core.config import settings
+
 class ChatRequest(BaseModel):
     user_id: str
     message: str
     history: Optional[List[dict]] = []      #Type Hinting လို့ခေါ်တဲ့ နည်းလမ်းနဲ့ AI ကို ရှေ့ကပြောခဲ့တဲ့ စကားတွေကို မှတ်မိခိုင်းဖို့ (Memory ပေးဖို့) ရေး
 
+    # Size limits: oversized bodies are rejected (422) before any provider call.
+    @field_validator("message")
+    def message_size_validator(cls, value):
+        if len(value) > settings.CHAT_MESSAGE_MAX_CHARS:
+            raise ValueError(f"Message must be at most {settings.CHAT_MESSAGE_MAX_CHARS} characters")
+        return value
+
+    @field_validator("history")
+    def history_size_validator(cls, value):
+        if not value:
+            return value
+        if len(value) > settings.CHAT_HISTORY_MAX_ITEMS:
+            raise ValueError(f"History must have at most {settings.CHAT_HISTORY_MAX_ITEMS} messages")
+        total = sum(len(str(item)) for item in value)
+        if total > settings.CHAT_HISTORY_MAX_CHARS:
+            raise ValueError(f"History must be at most {settings.CHAT_HISTORY_MAX_CHARS} characters in total")
+        return value
+
 class VideoResponse(BaseModel):
     title: str
     link: str
@@ -41,3 +61,7 @@ class PortfolioRequest(BaseModel):
     career_role: str
     skills: str
     summary: str
+
+class JobMatchRequest(BaseModel):
+    description: str
+    k: int = 10
@@ -1,28 +1,61 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List
-from backend.app.core.db_utility import database_initialize
+from backend.app.core.config import settings
+from backend.app.core.db_utility import check_database, database_initialize, pool_stats
+from backend.app.database.chat_log_writer import chat_log_writer
+from backend.app.core.clients import clients
+from backend.app.core import metrics
+from backend.app.core.admission import user_rate_limiter
+from backend.app.core.singleflight import flights
+from backend.app.middleware.AuthenticationMiddleware import AuthenticationMiddleware
+from backend.app.middleware.timer import ProcessTimeMiddleware
+from backend.app.core.pagination import decode_cursor, encode_cursor, json_number, parse_fields
+from backend.app.services.candidate_search import candidate_search
+from backend.app.services.context_builder import context_builder, merge_history
+from backend.app.services.job_queue import job_queue
+from backend.app.services.intent_router import intent_router
+from backend.app.services.password_hashing import password_hasher
+from backend.app.services.portfolio_matcher import portfolio_matcher
+from backend.app.services.response_cache import catalog_cache, cached_response, unavailable_response
+from backend.app.services.user_cache import user_cache
+from backend.app.services.youtube_service import youtube_search
 from contextlib import asynccontextmanager
 
 
 
 # Import Schemas from Schemas.py
-from backend.app.Schemas.schemas import ChatRequest
+from backend.app.Schemas.schemas import ChatRequest, JobMatchRequest
 
 # Import storage functions
-from backend.app.database.storage import get_all_lectures, get_all_candidates
+from backend.app.database.storage import get_lectures_page, get_candidates_page
 
 
 @asynccontextmanager
 async def db_lifespan(app: FastAPI):
     await database_initialize()
+    await chat_log_writer.start()
+    candidate_search.start()
+    portfolio_matcher.start()
+    job_queue.start()
     yield
+    await job_queue.stop()
+    await chat_log_writer.stop()
+    await clients.aclose_all()
+    youtube_search.close()
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="EduBridge AI API", version="0.0.1" , lifespan=db_lifespan)
 
 
+# Innermost, so its 401/403 responses still get the CORS headers below.
+# It sets request.state.user for the routes and the rate limiter.
+app.add_middleware(AuthenticationMiddleware)
+
 # CORS Setup - allows all origin including localhost:3000 for Next.js frontend
 app.add_middleware(
     CORSMiddleware,
@@ -31,12 +64,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the recorded time covers the whole middleware stack
+app.add_middleware(ProcessTimeMiddleware)
+
 # Import and include the router from agent_route.py
 from backend.app.routes.v1.agent_route import router as issues_router
 from backend.app.routes.v1.authentication_route import router as authentication_router
+from backend.app.routes.v1.jobs_route import router as jobs_router
 
 app.include_router(issues_router)
 app.include_router(authentication_router)
+app.include_router(jobs_router)
 
 
 # Health Check Endpoint
@@ -45,62 +83,233 @@ async def root():
     return {"status": "ok", "message": "EduBridge AI API is running"}
 
 
+@app.get("/health/db")
+async def database_health():
+    """Readiness check: one query through the pool, plus the pool's state"""
+    try:
+        latency = await asyncio.wait_for(check_database(), settings.DB_POOL_TIMEOUT_SECONDS)
+    except Exception as e:
+        print(f"Database health check failed: {e!r}")
+        return JSONResponse(status_code=503, content={"status": "error", "pool": pool_stats()})
+    return {"status": "ok", "latency_ms": round(latency * 1000, 1), "pool": pool_stats()}
+
+
+# ========================
+# METRICS
+# ========================
+
+def _gateway_stats(cache_name: str):
+    def stats():
+        if not clients.is_created("llm_gateway"):
+            return {}
+        cache = getattr(clients.get("llm_gateway"), cache_name)
+        return cache.stats() if cache is not None else {}
+    return stats
+
+
+metrics.register_stats("db_pool", pool_stats)
+metrics.register_stats("chat_log_writer", chat_log_writer.stats)
+metrics.register_stats("catalog_cache", catalog_cache.stats)
+metrics.register_stats("user_cache", user_cache.stats)
+metrics.register_stats("password_hasher", password_hasher.stats)
+metrics.register_stats("youtube", youtube_search.stats)
+metrics.register_stats("jobs", job_queue.stats)
+metrics.register_stats("context", context_builder.stats)
+metrics.register_stats("llm_cache", _gateway_stats("response_cache"))
+metrics.register_stats("semantic_cache", _gateway_stats("semantic_cache"))
+metrics.register_stats("rate_limit", user_rate_limiter.stats)
+metrics.register_stats("intent_router", intent_router.stats)
+metrics.register_stats(
+    "llm_admission",
+    lambda: clients.get("llm_gateway").admission_stats() if clients.is_created("llm_gateway") else {},
+)
+for name, flight in flights.items():
+    metrics.register_stats(f"singleflight_{name}", flight.stats)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
 # ========================
 # LECTURES API ENDPOINTS
 # ========================
 
-@app.get("/api/lectures")
-async def get_lectures():
-    """Fetch all lectures from the database and return with embed URLs"""
-    lectures = get_all_lectures()
+# Output field -> database columns it is built from
+LECTURE_FIELDS = {
+    "id": ["id"],
+    "title": ["title"],
+    "youtubeId": ["youtube_id"],
+    "embed_url": ["youtube_id"],
+    "duration": ["duration"],
+    "course": ["course"],
+}
+
+
+def serialize_lecture(lecture: dict) -> dict:
+    """Transform a lecture row to include the embed URL"""
+    youtube_id = lecture.get('youtube_id', '')
+    embed_url = f"https://www.youtube.com/embed/{youtube_id}" if youtube_id else ""
+
+    return {
+        "id": lecture.get('id'),
+        "title": lecture.get('title'),
+        "youtubeId": youtube_id,
+        "embed_url": embed_url,
+        "duration": lecture.get('duration'),
+        "course": lecture.get('course')
+    }
+
+
+async def build_lectures_payload(fields: list[str], limit: int, after: list | None, course: str | None):
+    """Fetch one page of lectures from the database and return with embed URLs"""
+    columns = sorted({"id", *(c for f in fields for c in LECTURE_FIELDS[f])})
+    lectures = await get_lectures_page(
+        columns, limit + 1, after_id=after[0] if after else None, course=course
+    )
+
+    next_cursor = None
+    if len(lectures) > limit:
+        lectures = lectures[:limit]
+        next_cursor = encode_cursor([lectures[-1]["id"]])
 
-    # Transform to include embed URL
     result = []
     for lecture in lectures:
-        youtube_id = lecture.get('youtube_id', '')
-        embed_url = f"https://www.youtube.com/embed/{youtube_id}" if youtube_id else ""
+        row = serialize_lecture(lecture)
+        result.append({f: row[f] for f in fields})
+
+    return {"lectures": result, "next_cursor": next_cursor}
 
-        result.append({
-            "id": lecture.get('id'),
-            "title": lecture.get('title'),
-            "youtubeId": youtube_id,
-            "embed_url": embed_url,
-            "duration": lecture.get('duration'),
-            "course": lecture.get('course')
-        })
 
-    return {"lectures": result}
+@app.get("/api/lectures")
+async def get_lectures(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    fields: str | None = None,
+    course: str | None = None,
+):
+    """Serve a page of the lectures catalog from the response cache (ETag / 304 aware)"""
+    output_fields = parse_fields(fields, LECTURE_FIELDS)
+    after = decode_cursor(cursor, 1)
+
+    key = f"lectures:{cursor}:{limit}:{','.join(output_fields)}:{course}"
+    try:
+        entry = await catalog_cache.get_or_build(
+            key, lambda: build_lectures_payload(output_fields, limit, after, course)
+        )
+    except Exception:
+        return unavailable_response()
+    return cached_response(request, entry)
 
 
 # ========================
 # CANDIDATES API ENDPOINTS
 # ========================
 
-@app.get("/api/candidates")
-async def get_candidates():
-    """Fetch all candidates from the database"""
-    candidates = get_all_candidates()
+CANDIDATE_FIELDS = {
+    "id": ["id"],
+    "name": ["name"],
+    "role": ["role"],
+    "skills": ["skills"],
+    "match_score": ["match_score"],
+    "experience": ["experience"],
+    "summary": ["summary"],
+    "location": ["location"],
+}
+
+
+def serialize_candidate(candidate: dict) -> dict:
+    """Transform skills from string to array if needed"""
+    skills = candidate.get('skills', '')
+    # If skills is a string, split by comma
+    if isinstance(skills, str):
+        skills = [s.strip() for s in skills.split(',') if s.strip()]
+
+    return {
+        "id": candidate.get('id'),
+        "name": candidate.get('name'),
+        "role": candidate.get('role'),
+        "skills": skills,
+        "match_score": candidate.get('match_score'),
+        "experience": candidate.get('experience'),
+        "summary": candidate.get('summary'),
+        "location": candidate.get('location')
+    }
+
+
+async def build_candidates_payload(
+    fields: list[str],
+    limit: int,
+    after: list | None,
+    role: str | None,
+    location: str | None,
+    skill: str | None,
+):
+    """Fetch one page of candidates from the database"""
+    columns = sorted({"id", "match_score", *(c for f in fields for c in CANDIDATE_FIELDS[f])})
+    candidates = await get_candidates_page(
+        columns, limit + 1, after=tuple(after) if after else None,
+        role=role, location=location, skill=skill,
+    )
+
+    next_cursor = None
+    if len(candidates) > limit:
+        candidates = candidates[:limit]
+        last = candidates[-1]
+        next_cursor = encode_cursor([json_number(last["match_score"]), last["id"]])
 
-    # Transform skills from string to array if needed
     result = []
     for candidate in candidates:
-        skills = candidate.get('skills', '')
-        # If skills is a string, split by comma
-        if isinstance(skills, str):
-            skills = [s.strip() for s in skills.split(',') if s.strip()]
+        row = serialize_candidate(candidate)
+        result.append({f: row[f] for f in fields})
 
-        result.append({
-            "id": candidate.get('id'),
-            "name": candidate.get('name'),
-            "role": candidate.get('role'),
-            "skills": skills,
-            "match_score": candidate.get('match_score'),
-            "experience": candidate.get('experience'),
-            "summary": candidate.get('summary'),
-            "location": candidate.get('location')
-        })
+    return {"candidates": result, "next_cursor": next_cursor}
 
-    return {"candidates": result}
+
+@app.get("/api/candidates")
+async def get_candidates(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    fields: str | None = None,
+    role: str | None = None,
+    location: str | None = None,
+    skill: str | None = None,
+):
+    """Serve a page of the candidates catalog from the response cache (ETag / 304 aware)"""
+    output_fields = parse_fields(fields, CANDIDATE_FIELDS)
+    after = decode_cursor(cursor, 2)
+
+    key = f"candidates:{cursor}:{limit}:{','.join(output_fields)}:{role}:{location}:{skill}"
+    try:
+        entry = await catalog_cache.get_or_build(
+            key, lambda: build_candidates_payload(output_fields, limit, after, role, location, skill)
+        )
+    except Exception:
+        return unavailable_response()
+    return cached_response(request, entry)
+
+
+@app.get("/api/candidates/search")
+async def search_candidates(
+    skills: str = Query(..., description="Comma-separated skills, e.g. python,react"),
+    k: int = Query(10, ge=1, le=100),
+):
+    """Rank candidates and students by weighted skill overlap"""
+    results = await candidate_search.search(skills.split(","), k)
+    return {"results": results}
+
+
+@app.post("/api/candidates/match")
+async def match_candidates(request: JobMatchRequest):
+    """Rank student portfolios by semantic similarity to a job description"""
+    k = max(1, min(request.k, 100))
+    results = await portfolio_matcher.match(request.description, k)
+    return {"results": results}
 
 
 # ========================
@@ -112,54 +321,14 @@ class ChatResponse(BaseModel):
     reply: str
 
 
-# Simple AI Response Generator (Replace with your actual AI model)
-def generate_ai_response(message: str, history: List[dict]) -> str:
-    """Generate AI response based on user message"""
-    message_lower = message.lower()
-
-    # Greeting responses
-    if any(word in message_lower for word in ["hello", "hi", "hey", "မင်္ဂလာပါ", "ဟယ်လို"]):
-        return "Hello! I'm your AI learning assistant. How can I help you today? You can ask me about courses, assignments, career guidance, or any questions about your learning journey."
-
-    # Course related
-    elif any(word in message_lower for word in ["course", "class", "သင်တန်း", "ကောက်စာ"]):
-        return "I can help you with courses! Check out the Courses section in your dashboard to browse available courses. You can enroll in courses that match your career goals."
-
-    # Assignment related
-    elif any(word in message_lower for word in ["assignment", "homework", "task", "အလုပ်", "ပါစီယာ"]):
-        return "Looking for assignments? Visit the Assignments page to see your pending tasks. Make sure to submit them before the deadline!"
-
-    # Career related
-    elif any(word in message_lower for word in ["career", "job", "employment", "အလုပ်", "အသက်လမ်း"]):
-        return "For career guidance, check out the Career page. We offer AI-powered career recommendations, job listings, and interview preparation tools."
-
-    # Interview prep
-    elif any(word in message_lower for word in ["interview", "အင်တာဗျူး", "အင်တာဗျူးပြင်ဆင်ခြင်း"]):
-        return "Visit the AI Interview Practice page to prepare for interviews. You can practice with mock interviews and get AI-powered feedback on your responses."
-
-    # Portfolio
-    elif any(word in message_lower for word in ["portfolio", "project", "ပရိုဂျက်", "ပါဝါလီအိုက်"]):
-        return "Build your portfolio in the AI Portfolio section. Showcase your projects and skills to potential employers."
-
-    # Help
-    elif any(word in message_lower for word in ["help", "help လုပ်ပါး", "ကူညီပါး"]):
-        return "I'm here to help! You can ask me about:\n- Courses and enrollments\n- Assignments and deadlines\n- Career guidance\n- Interview preparation\n- Portfolio building\n- General questions about EduBridge AI"
-
-    # Thank you
-    elif any(word in message_lower for word in ["thanks", "thank you", "ကေးဇူးတင်ပါး", "ကျေးဇူးတင်ပါ"]):
-        return "You're welcome! Feel free to ask if you have more questions. I'm always here to help!"
-
-    # Default response
-    else:
-        return "I'm here to help! Try asking about courses, assignments, career guidance, interview preparation, or portfolio building. You can also ask me for general help!"
-
-
 # AI Chat Endpoint
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """AI Chat endpoint for the support chatbot"""
-    # Generate AI response
-    ai_reply = generate_ai_response(request.message, request.history or [])
+    # Canned reply picked by the compiled intent matcher; earlier user turns
+    # answer follow-ups that name no topic themselves.
+    turns = merge_history([], request.history or [], "", request.message)
+    ai_reply = intent_router.faq_reply(request.message, [t["content"] for t in turns if t["role"] == "user"])
 
     return ChatResponse(reply=ai_reply)
 
@@ -0,0 +1,191 @@
+"""Admission control: shed excess load early instead of queueing it.
+
+Two independent limits:
+
+- a token bucket per user (JWT ``sub``, or the client address for requests
+  without a valid token) caps how fast one user or script can start AI
+  requests. It is checked by the ``rate_limit`` dependency before any work.
+- a ConcurrencyLimiter per LLM provider caps the calls in flight to that
+  provider. Callers past the limit wait in a bounded queue for at most
+  ``wait_timeout`` seconds; beyond that they are rejected right away.
+
+Both reject with a ``retry_after`` hint, which the routes turn into
+429 Too Many Requests with a Retry-After header.
+"""
+import asyncio
+import contextlib
+import math
+import time
+
+from cachetools import TTLCache
+from fastapi import HTTPException, Request
+from starlette import status
+
+from backend.app.core.config import settings
+from backend.app.services.jwt_service import token_subject
+
+
+class Overloaded(Exception):
+    """Raised when a request is over a rate or concurrency limit."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def too_many_requests(retry_after: float, detail: str = "Too many requests, please try again shortly") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+# ========================
+# Per-user token bucket
+# ========================
+
+class UserRateLimiter:
+    """Token bucket per key: ``burst`` requests at once, refilled at ``rate`` per second.
+
+    A bucket left alone for burst/rate seconds is full again, so idle keys
+    simply expire from the TTL cache, which bounds memory to ``max_keys``.
+    """
+
+    def __init__(
+        self,
+        rate: float = settings.RATE_LIMIT_PER_MINUTE / 60,
+        burst: int = settings.RATE_LIMIT_BURST,
+        max_keys: int = settings.RATE_LIMIT_MAX_KEYS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = TTLCache(maxsize=max_keys, ttl=max(1.0, burst / rate) if rate > 0 else 3600)
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str, cost: float = 1.0):
+        """Take ``cost`` tokens from ``key``'s bucket or raise Overloaded."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens < cost:
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            raise Overloaded(f"rate limit exceeded for {key}", (cost - tokens) / self.rate)
+        self._buckets[key] = (tokens - cost, now)
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+user_rate_limiter = UserRateLimiter()
+
+
+def client_key(request: Request) -> str:
+    """Rate-limit key: the authenticated user, the token's subject, or the client address."""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return f"user:{user.id}"
+
+    token = None
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    else:
+        token = request.cookies.get("access_token")
+    subject = token_subject(token) if token else None
+    if subject:
+        return f"user:{subject}"
+
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def rate_limit(request: Request):
+    """Router dependency: 429 once the caller's token bucket is empty"""
+    if request.method == "OPTIONS":
+        return
+    try:
+        user_rate_limiter.acquire(client_key(request))
+    except Overloaded as e:
+        raise too_many_requests(e.retry_after)
+
+
+# ========================
+# Per-provider concurrency
+# ========================
+
+def parse_limits(spec: str, default: int = 32) -> dict[str, int]:
+    """``"default:32,gemini:10"`` -> {provider: limit}."""
+    limits = {}
+    for item in spec.split(","):
+        name, _, limit = item.strip().rpartition(":")
+        if name and limit.isdigit():
+            limits[name] = int(limit)
+    limits.setdefault("default", default)
+    return limits
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders at once, at most ``max_waiting`` waiters for a slot."""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_waiting: int = settings.LLM_PROVIDER_MAX_WAITING,
+        wait_timeout: float = settings.LLM_PROVIDER_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def saturated(self) -> bool:
+        """True when a new caller would be rejected without waiting."""
+        return self.active >= self.limit and self.waiting >= self.max_waiting
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self.saturated():
+            self.rejected += 1
+            raise Overloaded(f"{self.name}: {self.active} in flight, {self.waiting} waiting", self.wait_timeout)
+
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(self.wait_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise Overloaded(f"{self.name}: no free slot within {self.wait_timeout}s", self.wait_timeout)
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
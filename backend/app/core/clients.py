@@ -0,0 +1,45 @@
+import inspect
+from typing import Any, Callable
+
+
+class ClientRegistry:
+    """Named provider clients, constructed on first use and closed at shutdown.
+
+    Factories import their SDKs inside the function body, so importing the app
+    (every worker start and every reload) never pays for SDKs or clients that
+    are not used yet.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._closers: dict[str, Callable[[Any], Any]] = {}
+        self._instances: dict[str, Any] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], close: Callable[[Any], Any] | None = None):
+        self._factories[name] = factory
+        if close is not None:
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        if name not in self._instances:
+            self._instances[name] = self._factories[name]()
+        return self._instances[name]
+
+    def is_created(self, name: str) -> bool:
+        return name in self._instances
+
+    async def aclose_all(self):
+        for name, instance in list(self._instances.items()):
+            close = self._closers.get(name)
+            if close is None or instance is None:
+                continue
+            try:
+                result = close(instance)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error closing client {name}: {e}")
+        self._instances.clear()
+
+
+clients = ClientRegistry()
@@ -25,4 +25,113 @@ class Settings(BaseSettings):
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     COOKIE_SECURE: bool = os.getenv("COOKIE_SECURE", "false").lower() == "true"
 
+    # LLM provider gateway
+    GEMINI_API_KEY: str | None = os.getenv("GEMINI_API_KEY")
+    GROQ_API_KEY: str | None = os.getenv("GROQ_API_KEY")
+    SILICONFLOW_API_KEY: str | None = os.getenv("SILICONFLOW_API_KEY")
+    GEMINI_BASE_URL: str | None = os.getenv("GEMINI_BASE_URL")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+    SILICONFLOW_BASE_URL: str = os.getenv("SILICONFLOW_BASE_URL", "https://api.siliconflow.com/v1")
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-3-flash-preview")
+    GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+    SILICONFLOW_MODEL: str = os.getenv("SILICONFLOW_MODEL", "Qwen/Qwen2.5-7B-Instruct")
+    LLM_FAILOVER_ORDER: str = os.getenv("LLM_FAILOVER_ORDER", "groq,siliconflow,gemini")
+    LLM_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", 3))
+    LLM_FIRST_TOKEN_TIMEOUT_SECONDS: float = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT_SECONDS", 8))
+    LLM_REQUEST_TIMEOUT_SECONDS: float = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", 45))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    LLM_FAILURE_THRESHOLD: int = int(os.getenv("LLM_FAILURE_THRESHOLD", 3))
+    LLM_COOLDOWN_SECONDS: float = float(os.getenv("LLM_COOLDOWN_SECONDS", 30))
+
+    # Batched chat_history writer
+    CHAT_LOG_BATCH_SIZE: int = int(os.getenv("CHAT_LOG_BATCH_SIZE", 100))
+    CHAT_LOG_FLUSH_INTERVAL_MS: int = int(os.getenv("CHAT_LOG_FLUSH_INTERVAL_MS", 250))
+    CHAT_LOG_MAX_QUEUE: int = int(os.getenv("CHAT_LOG_MAX_QUEUE", 5000))
+    CHAT_LOG_ENQUEUE_TIMEOUT_MS: int = int(os.getenv("CHAT_LOG_ENQUEUE_TIMEOUT_MS", 50))
+    CHAT_LOG_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_LOG_DRAIN_TIMEOUT_SECONDS", 10))
+
+    # Catalog (lectures / candidates) response cache
+    CATALOG_CACHE_TTL_SECONDS: float = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", 60))
+    CATALOG_CACHE_STALE_SECONDS: float = float(os.getenv("CATALOG_CACHE_STALE_SECONDS", 300))
+    CATALOG_CACHE_MAX_ENTRIES: int = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 512))
+
+    # Semantic portfolio matching
+    EMBEDDING_DIM: int = int(os.getenv("EMBEDDING_DIM", 256))
+    PORTFOLIO_VECTOR_PATH: str | None = os.getenv("PORTFOLIO_VECTOR_PATH")
+
+    # Authenticated user cache
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", 10000))
+    AUTH_USER_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", 60))
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+    # YouTube video lookup
+    YOUTUBE_API_KEY: str | None = os.getenv("YOUTUBE_API_KEY")
+    YOUTUBE_API_BASE_URL: str = os.getenv("YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3")
+    YOUTUBE_TIMEOUT_SECONDS: float = float(os.getenv("YOUTUBE_TIMEOUT_SECONDS", 10))
+    YOUTUBE_CACHE_TTL_SECONDS: float = float(os.getenv("YOUTUBE_CACHE_TTL_SECONDS", 6 * 3600))
+    YOUTUBE_CACHE_MAX_ENTRIES: int = int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", 2048))
+    YOUTUBE_CACHE_PATH: str | None = os.getenv("YOUTUBE_CACHE_PATH")
+
+    # LLM response cache
+    LLM_CACHE_AGENTS: str = os.getenv("LLM_CACHE_AGENTS", "roadmap,support")
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+    LLM_CACHE_COST_PER_1K_TOKENS: float = float(os.getenv("LLM_CACHE_COST_PER_1K_TOKENS", 0.0005))
+
+    # Semantic (near-duplicate) prompt cache
+    SEMANTIC_CACHE_AGENTS: str = os.getenv("SEMANTIC_CACHE_AGENTS", "roadmap,cofounder")
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.9))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 4096))
+    SEMANTIC_CACHE_TTL_SECONDS: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 24 * 3600))
+
+    # Conversation context assembly. The response caches key on the earlier
+    # turns too, so cached agents get their history like the others.
+    CONTEXT_AGENTS: str = os.getenv("CONTEXT_AGENTS", "cofounder,mentor,support,roadmap")
+    CONTEXT_TOKEN_BUDGETS: str = os.getenv("CONTEXT_TOKEN_BUDGETS", "default:3000")
+    CONTEXT_HISTORY_ROWS: int = int(os.getenv("CONTEXT_HISTORY_ROWS", 40))
+    CONTEXT_SUMMARY_CACHE_SIZE: int = int(os.getenv("CONTEXT_SUMMARY_CACHE_SIZE", 10000))
+    CONTEXT_SUMMARY_TTL_SECONDS: float = float(os.getenv("CONTEXT_SUMMARY_TTL_SECONDS", 24 * 3600))
+    CONTEXT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", 300))
+
+    # Background jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 8))
+    JOB_MAX_QUEUE: int = int(os.getenv("JOB_MAX_QUEUE", 500))
+    JOB_STORE: str = os.getenv("JOB_STORE", "memory")
+    JOB_STORE_PATH: str = os.getenv("JOB_STORE_PATH", "jobs.sqlite3")
+    JOB_RESULT_TTL_SECONDS: float = float(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))
+    JOB_TIMEOUT_SECONDS: float = float(os.getenv("JOB_TIMEOUT_SECONDS", 120))
+
+    # Server-Sent Events
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+    # Admission control
+    RATE_LIMIT_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_PER_MINUTE", 30))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", 10))
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+    LLM_PROVIDER_CONCURRENCY: str = os.getenv("LLM_PROVIDER_CONCURRENCY", "default:32")
+    LLM_PROVIDER_MAX_WAITING: int = int(os.getenv("LLM_PROVIDER_MAX_WAITING", 64))
+    LLM_PROVIDER_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_PROVIDER_QUEUE_TIMEOUT_SECONDS", 5))
+    CHAT_MESSAGE_MAX_CHARS: int = int(os.getenv("CHAT_MESSAGE_MAX_CHARS", 8000))
+    CHAT_HISTORY_MAX_ITEMS: int = int(os.getenv("CHAT_HISTORY_MAX_ITEMS", 50))
+    CHAT_HISTORY_MAX_CHARS: int = int(os.getenv("CHAT_HISTORY_MAX_CHARS", 32000))
+
+    # Database connection pool (PostgreSQL only; other URLs keep SQLAlchemy defaults)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 10))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", os.getenv("DB_POOL_SIZE", 10)))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 256))
+    DB_COMMAND_TIMEOUT_SECONDS: float = float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", 30))
+    # "auto" turns PgBouncer mode on for Supabase's pooler (port 6543 / *.pooler.supabase.com)
+    DB_PGBOUNCER: str = os.getenv("DB_PGBOUNCER", "auto")
+
 settings = Settings()
@@ -1,15 +1,59 @@
+import asyncio
+import time
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.app.core.config import settings
 from backend.app.core.supabase_initialize import async_engine , async_session, Base
 
 async def get_async_session() -> AsyncGenerator[AsyncSession,None]:
     async with async_session() as session:
         yield session
 
+async def check_database() -> float:
+    """Round-trip ``SELECT 1`` on a pooled connection; returns the latency in seconds."""
+    start = time.perf_counter()
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return time.perf_counter() - start
+
+async def warm_pool(connections: int) -> int:
+    """Open up to ``connections`` pooled connections at once so the first
+    requests after a deploy do not pay for TCP/TLS/auth. Returns how many opened."""
+    size = getattr(async_engine.pool, "size", lambda: connections)()
+    connections = max(0, min(connections, size))
+
+    async def open_one():
+        conn = await async_engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    results = await asyncio.gather(*[open_one() for _ in range(connections)], return_exceptions=True)
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    errors = [e for e in results if isinstance(e, BaseException)]
+    if errors:
+        print(f"Database warm-up: {len(errors)} of {connections} connections failed: {errors[0]!r}")
+    return len(opened)
+
 async def database_initialize():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # The schema is managed by Alembic (backend/migration); startup only
+    # fills the connection pool.
+    await warm_pool(settings.DB_POOL_WARMUP)
 
+def pool_stats() -> dict:
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": pool.checkedout() / capacity if capacity else 0.0,
+    }
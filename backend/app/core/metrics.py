@@ -0,0 +1,183 @@
+"""Prometheus metrics.
+
+Request, LLM and database timings are recorded into prometheus_client
+histograms. The ``stats()`` counters that caches, queues and pools already
+keep are exported on every scrape through ``register_stats`` as
+``edubridge_<component>_<name>`` gauges.
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers: ``/metrics`` then aggregates the
+histograms and counters of every worker. The ``stats()`` gauges are
+per-process values and are only exported in single-process mode.
+"""
+import functools
+import os
+import re
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# ========================
+# HTTP
+# ========================
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the last response byte, by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled (streams count until their last chunk)",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# ========================
+# LLM providers
+# ========================
+
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "Provider call duration (full answer for streams)",
+    ["provider", "agent", "mode", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until a streaming provider produced its first token",
+    ["provider", "agent"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8),
+)
+LLM_TOKENS_STREAMED = Counter(
+    "llm_tokens_streamed_total",
+    "Estimated tokens forwarded from streaming providers",
+    ["provider", "agent"],
+)
+LLM_CACHE_HITS = Counter(
+    "llm_cache_hits_total",
+    "Answers served from a response cache instead of a provider",
+    ["agent", "cache"],
+)
+
+# ========================
+# Database
+# ========================
+
+DB_OPERATION_DURATION = Histogram(
+    "db_operation_duration_seconds",
+    "Duration of storage.py helpers, including waiting for a pooled connection",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of single SQL statements on the engine, by statement type",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a connection from the pool, including opening a new one",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS because the pool was exhausted",
+)
+
+
+def timed_db(operation: str):
+    """Decorator recording an async storage helper in DB_OPERATION_DURATION."""
+    histogram = DB_OPERATION_DURATION.labels(operation)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_engine(engine):
+    """Time every statement executed on a (sync or async) SQLAlchemy engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("metrics_start")
+        if starts:
+            kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+            DB_STATEMENT_DURATION.labels(kind).observe(time.perf_counter() - starts.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+# ========================
+# stats() export
+# ========================
+
+_stats_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(component: str, stats: Callable[[], dict]):
+    _stats_sources[re.sub(r"\W", "_", component)] = stats
+
+
+class _StatsCollector:
+    def collect(self):
+        for component, stats in list(_stats_sources.items()):
+            try:
+                values = stats() or {}
+            except Exception as e:
+                print(f"Error collecting {component} stats: {e}")
+                continue
+            for name, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                gauge = GaugeMetricFamily(f"edubridge_{component}_{name}", f"{component} {name}")
+                gauge.add_metric([], float(value))
+                yield gauge
+
+
+if not MULTIPROCESS:
+    REGISTRY.register(_StatsCollector())
+
+
+def render() -> tuple[bytes, str]:
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,46 @@
+import base64
+import json
+
+from fastapi import HTTPException
+from starlette import status
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque keyset cursor: the sort-key values of the last row on a page."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, size: int) -> list | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def parse_fields(fields: str | None, allowed: dict) -> list[str]:
+    """Split a ``fields=a,b`` parameter, defaulting to every allowed field."""
+    if not fields:
+        return list(allowed)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return requested
+
+
+def json_number(value):
+    """Make a DB numeric (e.g. Decimal) safe to embed in a cursor."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
@@ -0,0 +1,95 @@
+"""Collapse identical concurrent async calls into one.
+
+The first caller for a key starts the call as a task; callers that arrive
+while it is running await the same task and get the same result (or the same
+exception). Nothing is cached: once the call finishes, the next caller starts
+a new one.
+
+Cancellation is per caller: a cancelled caller stops waiting but the shared
+call keeps running for the others, and it is only cancelled when every
+caller waiting on it has gone.
+
+    flight = SingleFlight("lectures")
+    rows = await flight.do(("page", course), lambda: fetch_page(course))
+
+or, for a function whose arguments identify the call::
+
+    @coalesce
+    async def get_all_lectures(): ...
+"""
+import asyncio
+import functools
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(functools.partial(self._finished, key))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            # shield: cancelling one caller must not cancel the shared task.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._calls.get(key) is task and self._waiters[key] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        # Mark the exception as retrieved even if every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+flights: dict[str, SingleFlight] = {}
+
+
+def _call_key(args: tuple, kwargs: dict) -> Hashable:
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        # Unhashable arguments (e.g. a list of columns): their repr identifies the call.
+        return repr(key)
+
+
+def coalesce(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorator: concurrent calls with equal arguments share one execution."""
+    flight = flights.setdefault(fn.__qualname__, SingleFlight(fn.__qualname__))
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await flight.do(_call_key(args, kwargs), lambda: fn(*args, **kwargs))
+
+    wrapper.flight = flight
+    return wrapper
@@ -0,0 +1,80 @@
+"""Server-Sent Events helpers.
+
+Producers are async generators of ``(event, data)`` pairs; ``sse_response``
+turns one into a ``text/event-stream`` response that:
+
+- serializes ``data`` as one-line JSON per event,
+- sends a comment line as a heartbeat whenever the producer is quiet for
+  ``heartbeat`` seconds, so proxies keep the connection open,
+- closes the producer as soon as the client goes away. A watcher task
+  waits for ``http.disconnect`` and is raced against every producer step,
+  so a disconnect is noticed while tokens are flowing too, not only at a
+  heartbeat or a failed write. Closing runs the producer's ``finally``
+  blocks, which is what stops an upstream LLM stream and any helper tasks
+  instead of letting them run to completion unread.
+"""
+import asyncio
+import contextlib
+import json
+from typing import Any, AsyncIterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from backend.app.core.config import settings
+
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def wait_disconnected(request: Request):
+    """Return once the client has disconnected (the request body is already read)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def event_stream(
+    events: AsyncIterator[tuple[str, Any]],
+    request: Request,
+    heartbeat: float = settings.SSE_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    iterator = events.__aiter__()
+    pending: asyncio.Future | None = None
+    disconnected = asyncio.ensure_future(wait_disconnected(request))
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            # wait() rather than wait_for(): a heartbeat must not cancel the
+            # producer's in-flight step.
+            done, _ = await asyncio.wait(
+                {pending, disconnected}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                return
+            if not done:
+                yield ": heartbeat\n\n"
+                continue
+
+            step, pending = pending, None
+            try:
+                event, data = step.result()
+            except StopAsyncIteration:
+                return
+            yield format_event(event, data)
+    finally:
+        disconnected.cancel()
+        if pending is not None:
+            pending.cancel()
+            with contextlib.suppress(BaseException):
+                await pending
+        await iterator.aclose()
+
+
+def sse_response(events: AsyncIterator[tuple[str, Any]], request: Request) -> StreamingResponse:
+    return StreamingResponse(event_stream(events, request), media_type="text/event-stream", headers=HEADERS)
@@ -1,8 +1,76 @@
+import time
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from backend.app.core.config import settings
+from backend.app.core.metrics import DB_POOL_CHECKOUT_DURATION, DB_POOL_CHECKOUT_TIMEOUTS, instrument_engine
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout (wait + connect + pre-ping) takes."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_DURATION.observe(time.perf_counter() - start)
+
+
+def pgbouncer_mode(url: str) -> bool:
+    if settings.DB_PGBOUNCER != "auto":
+        return settings.DB_PGBOUNCER.lower() == "true"
+    parsed = urlparse(url)
+    return parsed.port == 6543 or (parsed.hostname or "").endswith("pooler.supabase.com")
 
-async_engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+def connect_args(url: str) -> dict:
+    """asyncpg connection arguments (also used by the migrations)."""
+    if not url or not url.startswith("postgresql+asyncpg"):
+        return {}
+    args = {
+        "command_timeout": settings.DB_COMMAND_TIMEOUT_SECONDS,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"application_name": "edubridge-api"},
+    }
+    if pgbouncer_mode(url):
+        # A transaction-mode pooler hands each transaction to any server
+        # connection, so prepared statements must not be cached or reused
+        # by name across transactions.
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
+
+def engine_options(url: str) -> dict:
+    """create_async_engine keyword arguments; pool tuning applies to PostgreSQL only."""
+    if not url or not url.startswith("postgresql"):
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # Reuse the most recently returned connection so surplus idle ones age
+        # out through pool_recycle instead of all being kept warm.
+        "pool_use_lifo": True,
+        "connect_args": connect_args(url),
+    }
+
+
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI, **engine_options(settings.SQLALCHEMY_DATABASE_URI)
+)
+instrument_engine(async_engine)
 async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False, class_=AsyncSession)
 Base = declarative_base()
-
@@ -0,0 +1,142 @@
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+
+from backend.app.core.config import settings
+from backend.app.database.storage import save_chat_batch
+
+_STOP = object()
+
+
+class ChatLogWriter:
+    """Queue chat messages and persist them to chat_history in bulk inserts.
+
+    Rows are flushed every ``batch_size`` rows or every ``flush_interval``
+    seconds, whichever comes first. The queue is bounded: ``write`` waits up
+    to ``enqueue_timeout`` seconds for space and then drops the row, so a slow
+    database slows chat requests down by at most that much.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.CHAT_LOG_BATCH_SIZE,
+        flush_interval: float = settings.CHAT_LOG_FLUSH_INTERVAL_MS / 1000,
+        max_queue: int = settings.CHAT_LOG_MAX_QUEUE,
+        enqueue_timeout: float = settings.CHAT_LOG_ENQUEUE_TIMEOUT_MS / 1000,
+        drain_timeout: float = settings.CHAT_LOG_DRAIN_TIMEOUT_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._batch: list = []
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def start(self):
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="chat-log-writer")
+
+    async def stop(self):
+        """Stop accepting rows and flush everything still queued."""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            # The put is under the timeout too: with a full queue and a
+            # database that is down it would otherwise wait forever.
+            async with asyncio.timeout(self.drain_timeout):
+                await self._queue.put(_STOP)
+                await self._task
+        except TimeoutError:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            lost = len(self._batch)
+            while not self._queue.empty():
+                if self._queue.get_nowait() is not _STOP:
+                    lost += 1
+            print(f"Chat log writer drain timed out, {lost} rows lost")
+            self.dropped += lost
+            self._batch = []
+        self._task = None
+
+    async def write(self, user_id: str, role: str, message: str, agent_type: str) -> bool:
+        """Queue one chat message. Returns False when the row was dropped."""
+        if self._queue is None or self._closing:
+            self.dropped += 1
+            return False
+
+        row = {
+            "user_id": user_id,
+            "role": role,
+            "message": message,
+            "agent_type": agent_type,
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                async with asyncio.timeout(self.enqueue_timeout):
+                    await self._queue.put(row)
+            except TimeoutError:
+                self.dropped += 1
+                return False
+
+        self.enqueued += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            row = await self._queue.get()
+            if row is _STOP:
+                break
+
+            batch = self._batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        row = await self._queue.get()
+                except TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+            self._batch = []
+
+    async def _flush(self, batch: list):
+        self.batches += 1
+        ok = await save_chat_batch(batch)
+        if ok:
+            self.written += len(batch)
+        else:
+            self.failed += len(batch)
+
+
+chat_log_writer = ChatLogWriter()
@@ -2,156 +2,204 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-import os
-from google import genai
-from openai import AsyncOpenAI
-from googleapiclient.discovery import build
-from supabase import create_client, Client 
-
-# Check for required API keys
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    print("Warning: GEMINI_API_KEY is not set!")
-
-# Gemini Setup - only initialize if API key exists
-if GEMINI_API_KEY:
-    gemini_client = genai.Client(api_key=GEMINI_API_KEY, http_options={'api_version': 'v1alpha'})
-else:
-    gemini_client = None
-
-# SiliconFlow & Groq Setup (OpenAI SDK)
-SILICONFLOW_API_KEY = os.getenv("SILICONFLOW_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-if SILICONFLOW_API_KEY:
-    sf_client = AsyncOpenAI(
-        api_key=SILICONFLOW_API_KEY, 
-        base_url="https://api.siliconflow.com/v1"
-    )
-else:
-    sf_client = None
-
-if GROQ_API_KEY:
-    groq_client = AsyncOpenAI(
-        api_key=GROQ_API_KEY, 
-        base_url="https://api.groq.com/openai/v1"
-    )
-else:
-    groq_client = None
-
-# OpenAI client not needed - using SiliconFlow and Groq instead
-openai_client = None
-
-# YouTube API Setup
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-youtube_service = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-
-def get_youtube_videos(query: str):
-    try:
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-        request = youtube.search().list(
-            q=query, part='snippet', 
-            type='video', maxResults=3
-        )
-        response = request.execute()
-        return [{"title": v['snippet']['title'], "link": f"https://youtu.be/{v['id']['videoId']}"} for v in response['items']]
-    except:
-        return []
-    
-# --- Database Setup (Supabase) ---
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# Initialize supabase as None by default
-supabase = None
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("Warning: Supabase credentials are missing!")
-else:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Chat save function
-def save_chat_to_db(user_id: str, role: str, message: str, agent_type: str):
+from sqlalchemy import DateTime, and_, column, insert, or_, select, table
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.app.core.metrics import timed_db
+from backend.app.core.singleflight import coalesce
+from backend.app.core.supabase_initialize import async_engine
+
+# LLM provider clients live in backend.app.services.llm_gateway
+
+# YouTube lookups live in backend.app.services.youtube_service
+
+# --- Database Setup (Supabase Postgres) ---
+# These tables are managed in Supabase; they are queried through the pooled
+# async SQLAlchemy engine so no query blocks the event loop.
+# Every helper is timed (db_operation_duration_seconds on /metrics).
+# Read helpers are wrapped in @coalesce, so identical concurrent reads (a whole
+# class opening the same page) share one query.
+
+chat_history = table(
+    "chat_history",
+    column("user_id"),
+    column("role"),
+    column("message"),
+    column("agent_type"),
+    column("created_at", DateTime(timezone=True)),
+)
+
+student_portfolios = table(
+    "student_portfolios",
+    column("user_id"),
+    column("career_role"),
+    column("skills"),
+    column("summary"),
+    # created_at of the newest chat message already folded into the analysis
+    column("analyzed_until", DateTime(timezone=True)),
+)
+
+lectures = table(
+    "lectures",
+    column("id"),
+    column("title"),
+    column("youtube_id"),
+    column("duration"),
+    column("course"),
+)
+
+candidates = table(
+    "candidates",
+    column("id"),
+    column("name"),
+    column("role"),
+    column("skills"),
+    column("match_score"),
+    column("experience"),
+    column("summary"),
+    column("location"),
+)
+
+
+def _contains(value: str) -> str:
+    """ILIKE pattern matching ``value`` anywhere, with wildcards in it escaped."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def _fetch_all(query) -> list[dict]:
+    async with async_engine.connect() as conn:
+        result = await conn.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+
+# Chat save function - one multi-row insert per batch (see chat_log_writer.py)
+@timed_db("save_chat_batch")
+async def save_chat_batch(rows: list[dict]) -> bool:
     try:
-        if supabase:
-            supabase.table("chat_history").insert({
-                "user_id": user_id,
-                "role": role,
-                "message": message,
-                "agent_type": agent_type
-            }).execute()
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(chat_history).values(rows))
+        return True
     except Exception as e:
         print(f"Error saving to DB: {e}")
+    return False
 
 # Get chat history for a user
-def get_chat_history(user_id: str, limit: int = 50):
+@coalesce
+@timed_db("get_chat_history")
+async def get_chat_history(user_id: str, limit: int = 50):
     try:
-        if supabase:
-            response = supabase.table("chat_history").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
-            return response.data or []
+        return await _fetch_all(
+            select(chat_history)
+            .where(chat_history.c.user_id == user_id)
+            .order_by(chat_history.c.created_at.desc())
+            .limit(limit)
+        )
+    except Exception as e:
+        print(f"Error fetching chat history: {e}")
+    return []
+
+# Chat messages newer than a watermark, oldest first (incremental portfolio analysis).
+# Without a watermark, the newest ``limit`` messages are returned.
+@coalesce
+@timed_db("get_chat_history_since")
+async def get_chat_history_since(user_id: str, since=None, limit: int = 50):
+    try:
+        query = select(chat_history).where(chat_history.c.user_id == user_id)
+        if since is None:
+            rows = await _fetch_all(query.order_by(chat_history.c.created_at.desc()).limit(limit))
+            return rows[::-1]
+        return await _fetch_all(
+            query.where(chat_history.c.created_at > since)
+            .order_by(chat_history.c.created_at.asc())
+            .limit(limit)
+        )
     except Exception as e:
         print(f"Error fetching chat history: {e}")
     return []
 
 # Save portfolio to student_portfolios table
-def save_portfolio(user_id: str, career_role: str, skills: str, summary: str):
+@timed_db("save_portfolio")
+async def save_portfolio(user_id: str, career_role: str, skills: str, summary: str, analyzed_until=None):
     try:
-        if supabase:
-            # Check if portfolio exists for this user
-            existing = supabase.table("student_portfolios").select("*").eq("user_id", user_id).execute()
-            
-            if existing.data and len(existing.data) > 0:
-                # Update existing portfolio
-                supabase.table("student_portfolios").update({
-                    "career_role": career_role,
-                    "skills": skills,
-                    "summary": summary
-                }).eq("user_id", user_id).execute()
-            else:
-                # Insert new portfolio
-                supabase.table("student_portfolios").insert({
-                    "user_id": user_id,
-                    "career_role": career_role,
-                    "skills": skills,
-                    "summary": summary
-                }).execute()
-            return True
+        values = {"career_role": career_role, "skills": skills, "summary": summary}
+        if analyzed_until is not None:
+            values["analyzed_until"] = analyzed_until
+        # One atomic upsert on the unique user_id (migration 5c7d9e1f2a4b), so
+        # two first-time analyses running at once cannot both insert.
+        dialect = sqlite if async_engine.dialect.name == "sqlite" else postgresql
+        statement = dialect.insert(student_portfolios).values(user_id=user_id, **values)
+        statement = statement.on_conflict_do_update(index_elements=["user_id"], set_=values)
+        async with async_engine.begin() as conn:
+            await conn.execute(statement)
+        return True
     except Exception as e:
         print(f"Error saving portfolio: {e}")
     return False
 
 # Get portfolio for a user
-def get_portfolio(user_id: str):
+@coalesce
+@timed_db("get_portfolio")
+async def get_portfolio(user_id: str):
     try:
-        if supabase:
-            response = supabase.table("student_portfolios").select("*").eq("user_id", user_id).execute()
-            return response.data or []
+        return await _fetch_all(
+            select(student_portfolios).where(student_portfolios.c.user_id == user_id)
+        )
     except Exception as e:
         print(f"Error fetching portfolio: {e}")
     return []
 
+# Get every portfolio (used to build the candidate search indexes)
+@coalesce
+@timed_db("get_all_portfolios")
+async def get_all_portfolios():
+    try:
+        return await _fetch_all(select(student_portfolios))
+    except Exception as e:
+        print(f"Error fetching portfolios: {e}")
+    return []
+
 # ========================
 # LECTURES DATABASE FUNCTIONS
 # ========================
 
-def get_all_lectures():
+@coalesce
+@timed_db("get_all_lectures")
+async def get_all_lectures():
     """Fetch all lectures from the database"""
     try:
-        if supabase:
-            response = supabase.table("lectures").select("*").order("id").execute()
-            return response.data or []
+        return await _fetch_all(select(lectures).order_by(lectures.c.id))
     except Exception as e:
         print(f"Error fetching lectures: {e}")
     return []
 
-def get_lecture_by_id(lecture_id: int):
+@coalesce
+@timed_db("get_lectures_page")
+async def get_lectures_page(columns: list[str], limit: int, after_id=None, course: str | None = None):
+    """Fetch one keyset page of lectures ordered by id, with filters applied in SQL.
+
+    Errors propagate (after logging) so the response cache never stores an
+    outage as an empty page.
+    """
+    try:
+        query = select(*[lectures.c[name] for name in columns]).order_by(lectures.c.id).limit(limit)
+        if after_id is not None:
+            query = query.where(lectures.c.id > after_id)
+        if course:
+            query = query.where(lectures.c.course == course)
+        return await _fetch_all(query)
+    except Exception as e:
+        print(f"Error fetching lectures page: {e}")
+        raise
+
+@coalesce
+@timed_db("get_lecture_by_id")
+async def get_lecture_by_id(lecture_id: int):
     """Fetch a single lecture by ID"""
     try:
-        if supabase:
-            response = supabase.table("lectures").select("*").eq("id", lecture_id).execute()
-            if response.data:
-                return response.data[0]
+        rows = await _fetch_all(select(lectures).where(lectures.c.id == lecture_id))
+        if rows:
+            return rows[0]
     except Exception as e:
         print(f"Error fetching lecture: {e}")
     return None
@@ -160,24 +208,66 @@ def get_lecture_by_id(lecture_id: int):
 # CANDIDATES DATABASE FUNCTIONS
 # ========================
 
-def get_all_candidates():
+@coalesce
+@timed_db("get_all_candidates")
+async def get_all_candidates():
     """Fetch all candidates from the database"""
     try:
-        if supabase:
-            response = supabase.table("candidates").select("*").order("match_score", desc=True).execute()
-            return response.data or []
+        return await _fetch_all(select(candidates).order_by(candidates.c.match_score.desc()))
     except Exception as e:
         print(f"Error fetching candidates: {e}")
     return []
 
-def get_candidate_by_id(candidate_id: int):
+@coalesce
+@timed_db("get_candidates_page")
+async def get_candidates_page(
+    columns: list[str],
+    limit: int,
+    after: tuple | None = None,
+    role: str | None = None,
+    location: str | None = None,
+    skill: str | None = None,
+):
+    """Fetch one keyset page of candidates ordered by (match_score desc, id), with filters applied in SQL.
+
+    Errors propagate, as in get_lectures_page.
+    """
+    try:
+        score, cid = candidates.c.match_score, candidates.c.id
+        query = (
+            select(*[candidates.c[name] for name in columns])
+            .order_by(score.desc().nulls_last(), cid)
+            .limit(limit)
+        )
+        if after is not None:
+            last_score, last_id = after
+            if last_score is None:
+                query = query.where(and_(score.is_(None), cid > last_id))
+            else:
+                query = query.where(or_(
+                    score < last_score,
+                    and_(score == last_score, cid > last_id),
+                    score.is_(None),
+                ))
+        if role:
+            query = query.where(candidates.c.role.ilike(_contains(role), escape="\\"))
+        if location:
+            query = query.where(candidates.c.location.ilike(_contains(location), escape="\\"))
+        if skill:
+            query = query.where(candidates.c.skills.ilike(_contains(skill), escape="\\"))
+        return await _fetch_all(query)
+    except Exception as e:
+        print(f"Error fetching candidates page: {e}")
+        raise
+
+@coalesce
+@timed_db("get_candidate_by_id")
+async def get_candidate_by_id(candidate_id: int):
     """Fetch a single candidate by ID"""
     try:
-        if supabase:
-            response = supabase.table("candidates").select("*").eq("id", candidate_id).execute()
-            if response.data:
-                return response.data[0]
+        rows = await _fetch_all(select(candidates).where(candidates.c.id == candidate_id))
+        if rows:
+            return rows[0]
     except Exception as e:
         print(f"Error fetching candidate: {e}")
     return None
-
@@ -1,59 +1,98 @@
-from fastapi import Request
+from fastapi import HTTPException, Request
 from starlette import status
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from backend.app.models.psql_model import User
 from backend.app.services.jwt_service import decode_token
-from starlette.middleware.base import BaseHTTPMiddleware
 from jose import ExpiredSignatureError
 from backend.app.core.db_utility import async_session
+from backend.app.services.user_cache import token_id, user_cache
 from sqlalchemy.future import select
 
-EXCLUDED_PATH = ["/", "/openapi.json", "/docs", "/redoc"]
+# /metrics and /health/db are polled by the scraper and the load balancer.
+EXCLUDED_PATH = ["/", "/openapi.json", "/docs", "/redoc", "/metrics", "/health/db"]
 EXCLUDED_PREFIXES = ["/authentication"]
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
 
-        if request.method == "OPTIONS":
-            return await call_next(request)
+async def authenticate(request: Request) -> JSONResponse | None:
+    """Resolve the request's user into ``request.state.user``.
 
-        if request.url.path in EXCLUDED_PATH:
-            return await call_next(request)
-        if any(request.url.path.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
-            return await call_next(request)
+    Returns the error response to send instead when the request is not allowed through.
+    """
+    if request.method == "OPTIONS":
+        return None
 
-        if getattr(request.state, "user", None):
-            return await call_next(request)
+    if request.url.path in EXCLUDED_PATH:
+        return None
+    if any(request.url.path.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
+        return None
 
-        try:
-            access_token = None
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                access_token = auth_header.split(" ")[1]
-            else:
-                access_token = request.cookies.get("access_token")
+    if getattr(request.state, "user", None):
+        return None
 
-            payload = await decode_token(access_token)
-            if not payload:
-                return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"error": "Invalid token"})
+    try:
+        access_token = None
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            access_token = auth_header.split(" ")[1]
+        else:
+            access_token = request.cookies.get("access_token")
 
-            uuid = int(payload.get("sub"))
-            if uuid is None:
-                return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Invalid token"})
+        payload = await decode_token(access_token)
+        if not payload:
+            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"error": "Invalid token"})
 
-        except ExpiredSignatureError:
-            return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"error": "Token expired!"})
-        except Exception as e:
-            return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"error": str(e)})
+        uuid = int(payload.get("sub"))
+        if uuid is None:
+            return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": "Invalid token"})
 
+    except ExpiredSignatureError:
+        return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"error": "Token expired!"})
+    except Exception as e:
+        return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"error": str(e)})
+
+    token = token_id(payload)
+    res = user_cache.get(uuid, token)
+    if res is None:
         async with async_session() as session:
             user = await session.execute(select(User).where(User.id == uuid))
             res = user.scalars().first()
             if res is None:
                 return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"error": "User not found"})
+        user_cache.put(uuid, token, res)
+
+    if res.is_active is False:
+        return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"error": "User is inactive"})
+
+    request.state.user = res
+    return None
+
+
+def current_user_id(request: Request) -> str:
+    """Route dependency: id of the user this middleware verified for the request."""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return str(user.id)
+
+
+class AuthenticationMiddleware:
+    """Pure ASGI middleware: the downstream response, streamed or not, is passed
+    through untouched instead of being relayed through BaseHTTPMiddleware's
+    extra task and memory stream."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        request.state.user = res
-        return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        error = await authenticate(Request(scope, receive))
+        if error is not None:
+            await error(scope, receive, send)
+            return
 
+        await self.app(scope, receive, send)
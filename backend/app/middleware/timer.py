@@ -1,11 +1,64 @@
-import time
-from fastapi import Request
-
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    # Response Header မှာ ကြာချိန်ကို ထည့်ပေးခြင်း
-    response.headers["X-Process-Time"] = str(process_time)
-    print(f"Path: {request.url.path} | Time: {process_time:.4f}s")
-    return response
\ No newline at end of file
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+
+def _route_template(scope: Scope) -> str:
+    # Routing stores the matched endpoint in the scope; label by its path
+    # template ("/api/lectures/{id}") so the label set stays bounded.
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return "unmatched"
+    templates = getattr(app.state, "route_templates", None)
+    if templates is None:
+        templates = {
+            getattr(route, "endpoint", None): route.path
+            for route in app.router.routes
+            if hasattr(route, "path")
+        }
+        app.state.route_templates = templates
+    return templates.get(endpoint, "unmatched")
+
+
+class ProcessTimeMiddleware:
+    """Pure ASGI timing middleware.
+
+    ``X-Process-Time`` is the time until the response headers were sent. The
+    request duration histogram runs until the last body chunk, so streamed
+    responses are timed in full without being buffered; requests in flight
+    are tracked in a gauge. Both are exported on ``/metrics``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(scope["method"])
+        in_flight.inc()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start_time
+                # Response Header မှာ ကြာချိန်ကို ထည့်ပေးခြင်း
+                MutableHeaders(scope=message).append("X-Process-Time", str(process_time))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], _route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - start_time)
@@ -1,64 +1,105 @@
 import asyncio
-from fastapi import APIRouter
+import contextlib
+import time
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 import re
 import json
 
 from backend.app.Schemas.schemas import ChatRequest, VideoResponse
+from backend.app.core.admission import rate_limit, too_many_requests
+from backend.app.core.sse import sse_response
 from backend.app.database.storage import (
-    gemini_client,
-    sf_client,
-    groq_client,
-    get_youtube_videos,
-    save_chat_to_db,
-    get_chat_history,
+    get_chat_history_since,
+    get_portfolio,
     save_portfolio,
 )
+from backend.app.database.chat_log_writer import chat_log_writer
+from backend.app.services.candidate_search import candidate_search
+from backend.app.services.context_builder import context_builder
+from backend.app.services.intent_router import intent_router
+from backend.app.services.llm_cache import estimate_tokens
+from backend.app.services.portfolio_matcher import portfolio_matcher
+from backend.app.services.llm_gateway import LLMOverloaded, LLMUnavailableError, get_llm_gateway
+from backend.app.services.youtube_service import get_youtube_videos
+
+router = APIRouter(prefix="/chat", tags=["AI Agents"], dependencies=[Depends(rate_limit)])
+
+
+async def canned_or_shed(agent: str, request: ChatRequest) -> str | None:
+    """Canned reply for greetings, thanks and navigation questions (no provider call).
+
+    Only on the first turn: once the agent has conversation history, a
+    "thanks" or "hi" goes to the LLM, which can answer it in context.
+    Otherwise 429 when the agent's providers are all at their limit.
+    """
+    canned = intent_router.route(agent, request.message)
+    if canned is not None and await context_builder.has_history(agent, request):
+        canned = None
+    if canned is None:
+        shed_if_saturated(agent)
+    return canned
+
+
+def shed_if_saturated(agent: str):
+    """429 before a stream starts when every provider for ``agent`` is at its limit.
+
+    Once a streamed response has started its status can no longer change.
+    """
+    retry_after = get_llm_gateway().saturated(agent)
+    if retry_after is not None:
+        raise too_many_requests(retry_after, "AI service is busy, please try again shortly")
+
+# System prompts (shared by the JSON/text endpoints and the SSE stream)
+
+COFOUNDER_SYSTEM_PROMPT = (
+    "You are an expert strategic co-founder. "
+    "If the user greets without a specific idea, respond warmly. "
+    "If they provide a goal, give a clear step-by-step roadmap."
+)
 
-router = APIRouter(prefix="/chat", tags=["AI Agents"])
-
-#  SAFE GEMINI TEXT EXTRACTION
-
-def extract_gemini_text(response) -> str:
-    try:
-        if hasattr(response, "text") and response.text:
-            return response.text.strip()
-
-        if hasattr(response, "candidates") and response.candidates:
-            parts = response.candidates[0].content.parts
-            return "".join(
-                [p.text for p in parts if hasattr(p, "text")]
-            ).strip()
+MENTOR_SYSTEM_PROMPT = (
+    "You are a wise and supportive Interview Mentor. "
+    "Help the user practice for job interviews. "
+    "Ask about their background, skills, and target job. "
+    "Give structured feedback. "
+    "Keep responses clear, practical, and concise."
+)
 
-        return ""
+SUPPORT_SYSTEM_PROMPT = (
+    "You are a helpful and professional Customer Support Assistant. "
+    "Provide clear, concise, and accurate information."
+)
 
-    except Exception:
-        return ""
+ROADMAP_SYSTEM_PROMPT = (
+    "You are an expert career and business roadmap generator. "
+    "Create a detailed, step-by-step roadmap for the user's goal. "
+    "Include: 1. A clear title, 2. Brief overview, 3. 3-4 phases with titles and descriptions, "
+    "4. Duration for each phase, 5. Key tasks, 6. Helpful tips. "
+    "Be specific, actionable, and encouraging. Use current best practices for current year."
+)
 
 
-# CO-FOUNDER (Gemini)
+# CO-FOUNDER (Gemini first)
 
 @router.post("/cofounder")
 async def cofounder_chat(request: ChatRequest):
+    canned = await canned_or_shed("cofounder", request)
 
     async def generate():
         full_response = ""
 
-        asyncio.create_task(
-            asyncio.to_thread(
-                save_chat_to_db,
-                request.user_id,
-                "user",
-                request.message,
-                "cofounder",
-            )
+        await chat_log_writer.write(
+            request.user_id,
+            "user",
+            request.message,
+            "cofounder",
         )
 
-        CoFounder_system_prompt = (
-            "You are an expert strategic co-founder. "
-            "If the user greets without a specific idea, respond warmly. "
-            "If they provide a goal, give a clear step-by-step roadmap."
-        )
+        if canned is not None:
+            yield canned
+            await chat_log_writer.write(request.user_id, "assistant", canned, "Co-founder (intent)")
+            return
 
         msg = request.message.lower().strip()
         is_greeting = msg in ["hi", "hello", "hey"]
@@ -67,35 +108,23 @@ async def cofounder_chat(request: ChatRequest):
         video_task = None
         if not is_greeting and words_count > 2:
             video_task = asyncio.create_task(
-                asyncio.to_thread(
-                    get_youtube_videos,
-                    f"{request.message} business roadmap latest",
-                )
+                get_youtube_videos(f"{request.message} business roadmap latest")
             )
 
-        try:
-            if gemini_client is None:
-                yield "Gemini service not configured."
-                return
-
-            response = await asyncio.to_thread(
-                gemini_client.models.generate_content,
-                model="gemini-3-flash-preview",
-                contents=[
-                    {"role": "user", "parts": [{"text": CoFounder_system_prompt}]},
-                    {"role": "user", "parts": [{"text": request.message}]},
-                ],
-                config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 800,
-                },
-            )
+        # Native async streaming: tokens are forwarded as soon as the provider
+        # emits them and no worker thread is held for the generation.
+        stream = get_llm_gateway().stream(
+            "cofounder",
+            await context_builder.build_messages("cofounder", COFOUNDER_SYSTEM_PROMPT, request),
+        )
 
-            full_response = extract_gemini_text(response)
-            yield full_response
+        try:
+            async for content in stream:
+                full_response += content
+                yield content
 
-        except Exception as e:
-            print(f"Gemini Error: {e}")
+        except LLMUnavailableError as e:
+            print(f"Co-founder Error: {e}")
             yield "AI service is temporarily unavailable."
             return
 
@@ -119,219 +148,289 @@ async def cofounder_chat(request: ChatRequest):
             except Exception as e:
                 print(f"YouTube Error: {e}")
 
-        asyncio.create_task(
-            asyncio.to_thread(
-                save_chat_to_db,
-                request.user_id,
-                "assistant",
-                full_response,
-                "Co-founder (Gemini Flash)",
-            )
+        await chat_log_writer.write(
+            request.user_id,
+            "assistant",
+            full_response,
+            f"Co-founder ({stream.provider})",
         )
 
     return StreamingResponse(generate(), media_type="text/plain")
 
 
-# MENTOR (Groq)
+# MENTOR (Groq first)
 
 @router.post("/mentor")
 async def mentor_chat(request: ChatRequest):
+    canned = await canned_or_shed("mentor", request)
 
     async def generate():
         full_response = ""
 
-        mentor_system_prompt = (
-            "You are a wise and supportive Interview Mentor. "
-            "Help the user practice for job interviews. "
-            "Ask about their background, skills, and target job. "
-            "Give structured feedback. "
-            "Keep responses clear, practical, and concise."
-        )
-
-        asyncio.create_task(
-            asyncio.to_thread(
-                save_chat_to_db,
-                request.user_id,
-                "user",
-                request.message,
-                "mentor",
-            )
+        await chat_log_writer.write(
+            request.user_id,
+            "user",
+            request.message,
+            "mentor",
         )
 
-        if groq_client is None:
-            yield "Mentor service not configured."
+        if canned is not None:
+            yield canned
+            await chat_log_writer.write(request.user_id, "assistant", canned, "mentor (intent)")
             return
 
-        try:
-            stream = await groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": mentor_system_prompt},
-                    {"role": "user", "content": request.message},
-                ],
-                temperature=0.4,
-                max_tokens=500,
-                stream=True,
-            )
+        stream = get_llm_gateway().stream(
+            "mentor",
+            await context_builder.build_messages("mentor", MENTOR_SYSTEM_PROMPT, request),
+        )
 
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_response += content
-                    yield content
+        try:
+            async for content in stream:
+                full_response += content
+                yield content
 
-        except Exception as e:
-            print(f"Groq Mentor Error: {e}")
+        except LLMUnavailableError as e:
+            print(f"Mentor Error: {e}")
             yield "Mentor AI unavailable."
             return
 
-        asyncio.create_task(
-            asyncio.to_thread(
-                save_chat_to_db,
-                request.user_id,
-                "assistant",
-                full_response,
-                "mentor (Groq 8B Instant)",
-            )
+        await chat_log_writer.write(
+            request.user_id,
+            "assistant",
+            full_response,
+            f"mentor ({stream.provider})",
         )
 
     return StreamingResponse(generate(), media_type="text/plain")
 
 
-# SUPPORT (Groq)
+# SUPPORT (Groq first)
 
 @router.post("/support")
 async def support_chat(request: ChatRequest):
 
-    support_system_prompt = (
-        "You are a helpful and professional Customer Support Assistant. "
-        "Provide clear, concise, and accurate information."
+    await chat_log_writer.write(
+        request.user_id,
+        "user",
+        request.message,
+        "support",
     )
 
-    asyncio.create_task(
-        asyncio.to_thread(
-            save_chat_to_db,
-            request.user_id,
-            "user",
-            request.message,
-            "support",
-        )
-    )
+    canned = await canned_or_shed("support", request)
+    if canned is not None:
+        await chat_log_writer.write(request.user_id, "assistant", canned, "support (intent)")
+        return {"reply": canned}
 
     try:
-        if groq_client is None:
-            return {"reply": "Support service unavailable."}
-
-        response = await groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": support_system_prompt},
-                {"role": "user", "content": request.message},
-            ],
-            temperature=0.3,
-            max_tokens=400,
+        result = await get_llm_gateway().complete(
+            "support",
+            await context_builder.build_messages("support", SUPPORT_SYSTEM_PROMPT, request),
         )
 
-        reply = response.choices[0].message.content
+    except LLMOverloaded as e:
+        raise too_many_requests(e.retry_after, "Support service is busy, please try again shortly")
+    except LLMUnavailableError as e:
+        print(f"Support Error: {e}")
+        return {"reply": "Support service unavailable."}
 
-        asyncio.create_task(
-            asyncio.to_thread(
-                save_chat_to_db,
-                request.user_id,
-                "assistant",
-                reply,
-                "support (Groq 8B)",
-            )
-        )
+    reply = result.text
 
-        return {"reply": reply}
+    await chat_log_writer.write(
+        request.user_id,
+        "assistant",
+        reply,
+        f"support ({result.provider})",
+    )
 
-    except Exception as e:
-        print(f"Support Error: {e}")
-        return {"error": str(e)}
+    return {"reply": reply}
 
 
-# ROADMAP (Gemini)
+# ROADMAP (Gemini first)
 
 @router.post("/roadmap")
 async def generate_roadmap(request: ChatRequest):
 
-    roadmap_system_prompt = (
-        "You are an expert career and business roadmap generator. "
-        "Create a detailed, step-by-step roadmap for the user's goal. "
-        "Include: 1. A clear title, 2. Brief overview, 3. 3-4 phases with titles and descriptions, "
-        "4. Duration for each phase, 5. Key tasks, 6. Helpful tips. "
-        "Be specific, actionable, and encouraging. Use current best practices for current year."
-    )
-
-    asyncio.create_task(
-        asyncio.to_thread(
-            save_chat_to_db,
-            request.user_id,
-            "user",
-            request.message,
-            "roadmap",
-        )
+    await chat_log_writer.write(
+        request.user_id,
+        "user",
+        request.message,
+        "roadmap",
     )
 
-    roadmap_content = None
+    canned = await canned_or_shed("roadmap", request)
+    if canned is not None:
+        await chat_log_writer.write(request.user_id, "assistant", canned, "roadmap (intent)")
+        return {"roadmap": canned, "videos": []}
 
     try:
-        if gemini_client:
-
-            response = await asyncio.to_thread(
-                gemini_client.models.generate_content,
-                model="gemini-3-flash-preview",
-                contents=[
-                    {"role": "user", "parts": [{"text": roadmap_system_prompt}]},
-                    {"role": "user", "parts": [{"text": request.message}]},
-                ],
-                config={
-                    "temperature": 0.6,
-                    "max_output_tokens": 800,
-                },
-            )
-
-            roadmap_content = extract_gemini_text(response)
+        result = await get_llm_gateway().complete(
+            "roadmap",
+            await context_builder.build_messages("roadmap", ROADMAP_SYSTEM_PROMPT, request),
+        )
 
-    except Exception as e:
+    except LLMOverloaded as e:
+        raise too_many_requests(e.retry_after, "AI service is busy, please try again shortly")
+    except LLMUnavailableError as e:
         print(f"Roadmap Error: {e}")
-
-    if not roadmap_content:
         return {"error": "AI service unavailable", "roadmap": "", "videos": []}
 
+    roadmap_content = result.text
+
     videos = []
     try:
-        videos = await asyncio.to_thread(
-            get_youtube_videos,
-            f"{request.message} roadmap tutorial latest",
-        )
+        videos = await get_youtube_videos(f"{request.message} roadmap tutorial latest")
         videos = videos[:3]
     except Exception:
         pass
 
-    asyncio.create_task(
-        asyncio.to_thread(
-            save_chat_to_db,
-            request.user_id,
-            "assistant",
-            roadmap_content,
-            "roadmap (Gemini Flash)",
-        )
+    await chat_log_writer.write(
+        request.user_id,
+        "assistant",
+        roadmap_content,
+        f"roadmap ({result.provider})",
     )
 
     return {"roadmap": roadmap_content, "videos": videos}
 
 
-# PORTFOLIO ANALYSIS (Gemini)
+# SSE STREAMING (all chat agents)
+#
+# POST /chat/stream/{agent} answers with text/event-stream:
+#   event: token   data: {"text": "..."}
+#   event: videos  data: {"videos": [{"title": ..., "link": ...}]}
+#   event: error   data: {"message": "..."}
+#   event: done    data: {"provider", "model", "cached", "ttft_ms", "latency_ms", "usage"}
+# Greetings, thanks and navigation questions on a first turn get one canned
+# token and provider "intent".
+# If the client disconnects, the provider stream is closed and nothing is logged.
+
+def _cofounder_videos(request: ChatRequest) -> str | None:
+    msg = request.message.lower().strip()
+    if msg in ["hi", "hello", "hey"] or len(msg.split()) <= 2:
+        return None
+    return f"{request.message} business roadmap latest"
+
+
+def _cofounder_shows_videos(answer: str) -> bool:
+    return any(x in answer.lower() for x in ["roadmap", "step", "strategy", "launch"])
+
+
+STREAM_AGENTS = {
+    # agent: (system prompt, video query for the request, show videos for the answer)
+    "cofounder": (COFOUNDER_SYSTEM_PROMPT, _cofounder_videos, _cofounder_shows_videos),
+    "mentor": (MENTOR_SYSTEM_PROMPT, None, None),
+    "support": (SUPPORT_SYSTEM_PROMPT, None, None),
+    "roadmap": (
+        ROADMAP_SYSTEM_PROMPT,
+        lambda request: f"{request.message} roadmap tutorial latest",
+        lambda answer: True,
+    ),
+}
+
+
+async def agent_events(agent: str, request: ChatRequest, canned: str | None = None):
+    system_prompt, video_query, shows_videos = STREAM_AGENTS[agent]
+
+    await chat_log_writer.write(request.user_id, "user", request.message, agent)
+
+    if canned is not None:
+        yield "token", {"text": canned}
+        await chat_log_writer.write(request.user_id, "assistant", canned, f"{agent} (intent)")
+        yield "done", {
+            "provider": "intent",
+            "model": None,
+            "cached": True,
+            "ttft_ms": 0.0,
+            "latency_ms": 0.0,
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0},
+        }
+        return
+
+    query = video_query(request) if video_query else None
+    video_task = asyncio.create_task(get_youtube_videos(query)) if query else None
+
+    try:
+        messages = await context_builder.build_messages(agent, system_prompt, request)
+        stream = get_llm_gateway().stream(agent, messages)
+
+        start = time.perf_counter()
+        ttft = None
+        answer = ""
+        try:
+            # aclosing: a disconnect closes the provider stream right away
+            # rather than whenever the generator is garbage collected.
+            async with contextlib.aclosing(aiter(stream)) as tokens:
+                async for text in tokens:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    answer += text
+                    yield "token", {"text": text}
+        except LLMUnavailableError as e:
+            print(f"{agent} stream Error: {e}")
+            yield "error", {"message": "AI service is temporarily unavailable."}
+            return
+        latency = time.perf_counter() - start
+
+        if video_task is not None:
+            try:
+                videos = await video_task
+            except Exception as e:
+                print(f"YouTube Error: {e}")
+                videos = []
+            if videos and shows_videos(answer):
+                yield "videos", {"videos": videos[:3]}
+
+        await chat_log_writer.write(request.user_id, "assistant", answer, f"{agent} ({stream.provider})")
+
+        yield "done", {
+            "provider": stream.provider,
+            "model": stream.model,
+            "cached": stream.cached,
+            "ttft_ms": round((ttft or 0.0) * 1000, 1),
+            "latency_ms": round(latency * 1000, 1),
+            "usage": {
+                "prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+                "completion_tokens": estimate_tokens(answer),
+            },
+        }
+    finally:
+        if video_task is not None and not video_task.done():
+            video_task.cancel()
+
+
+@router.post("/stream/{agent}")
+async def stream_agent(agent: str, request: ChatRequest, http_request: Request):
+    """Stream any chat agent as Server-Sent Events"""
+    if agent not in STREAM_AGENTS:
+        raise HTTPException(status_code=404, detail=f"Unknown agent: {agent}")
+    canned = await canned_or_shed(agent, request)
+    return sse_response(agent_events(agent, request, canned), http_request)
+
+
+# PORTFOLIO ANALYSIS (Gemini first)
 @router.post("/portfolio-analysis")
 async def analyze_portfolio(request: ChatRequest):
-    """Portfolio Analysis: Fetch chat history, analyze with AI, and save to student_portfolios"""
-    
-    # 1. Fetch all messages from chat_history for this user
-    chat_logs = await asyncio.to_thread(get_chat_history, request.user_id, limit=50)
-    
+    """Portfolio Analysis: fold new chat messages into the saved student_portfolios profile"""
+
+    # 1. Previous profile and its watermark (created_at of the last analyzed message)
+    existing = await get_portfolio(request.user_id)
+    previous = existing[0] if existing else None
+    since = previous.get("analyzed_until") if previous else None
+
+    # Only messages that arrived after the last analysis
+    chat_logs = await get_chat_history_since(request.user_id, since, limit=50)
+
     if not chat_logs:
+        if previous and previous.get("career_role"):
+            # Nothing new since the last analysis: no LLM call needed
+            return {
+                "success": True,
+                "career_role": previous.get("career_role"),
+                "skills": previous.get("skills"),
+                "summary": previous.get("summary"),
+                "unchanged": True,
+                "message": "Portfolio is up to date."
+            }
         return {
             "error": "No chat history found",
             "message": "Start chatting with AI agents to build your portfolio analysis."
@@ -342,6 +441,20 @@ async def analyze_portfolio(request: ChatRequest):
         f"[{log.get('agent_type', 'unknown')}] {log.get('role', 'user')}: {log.get('message', '')}"
         for log in chat_logs
     ])
+
+    if previous and previous.get("career_role") and since is not None:
+        previous_profile = json.dumps({
+            "career_role": previous.get("career_role"),
+            "skills": previous.get("skills"),
+            "summary": previous.get("summary"),
+        }, ensure_ascii=False)
+        analysis_input = (
+            f"Current profile:\n{previous_profile}\n\n"
+            f"New learning logs since that profile:\n{formatted_logs}\n\n"
+            "Update the profile with what the new logs show. Keep whatever they do not change."
+        )
+    else:
+        analysis_input = f"Learning Logs:\n{formatted_logs}"
     
     # 2. AI Analysis prompt
     portfolio_system_prompt = (
@@ -350,55 +463,40 @@ async def analyze_portfolio(request: ChatRequest):
         "1. career_role: The most suitable career role for this student (e.g., Full Stack Developer, Data Scientist, Product Manager)\n"
         "2. skills: A comma-separated list of their top 5 skills (e.g., Python, React, Machine Learning, Communication, Leadership)\n"
         "3. summary: A 3-line professional summary for a CV (line1: expertise, line2: achievements, line3: career goal)\n\n"
-        f"Learning Logs:\n{formatted_logs}\n\n"
+        f"{analysis_input}\n\n"
         "Respond ONLY in JSON format like: "
         "{\"career_role\": \"...\", \"skills\": \"..., ..., ...\", \"summary\": \"... ... ...\"}"
     )
     
-    analysis_result = None
-    used_model = "Gemini (gemini-3-flash-preview)"
-    
-    # 3. Send to Gemini
+    # 3. Send to the LLM gateway
     try:
-        if gemini_client is None:
-            return {
-                "error": "AI service not configured",
-                "message": "Gemini client is not initialized."
-            }
-
-        response = await asyncio.to_thread(
-            gemini_client.models.generate_content,
-            model="gemini-3-flash-preview",
-            contents=[
-                {"role": "user", "parts": [{"text": portfolio_system_prompt}]},
-                {"role": "user", "parts": [{"text": "Analyze my learning logs and provide career insights."}]}
+        result = await get_llm_gateway().complete(
+            "portfolio",
+            [
+                {"role": "system", "content": portfolio_system_prompt},
+                {"role": "user", "content": "Analyze my learning logs and provide career insights."}
             ],
-            config={
-                "temperature": 0.4,              
-                "max_output_tokens": 500         
-            }
         )
 
-        # safer extraction (minimal change)
-        if hasattr(response, "text") and response.text:
-            analysis_result = response.text
-        else:
-            print("Empty Gemini response:", response)
-
-    except Exception as e:
-        print(f"Gemini Portfolio Analysis Error: {e}")
-    
-    if not analysis_result:
+    except LLMOverloaded as e:
+        raise too_many_requests(e.retry_after, "AI service is busy, please try again shortly")
+    except LLMUnavailableError as e:
+        print(f"Portfolio Analysis Error: {e}")
         return {
             "error": "AI analysis failed",
-            "message": "Gemini is currently unavailable. Please try again later."
+            "message": "AI service is currently unavailable. Please try again later."
         }
+
+    analysis_result = result.text
     
     
     try:
         json_match = re.search(r'\{[\s\S]*\}', analysis_result)
         if json_match:
             portfolio_data = json.loads(json_match.group())
+        elif previous and previous.get("career_role"):
+            # Keep the previous profile rather than replacing it with a generic one
+            portfolio_data = dict(previous)
         else:
             portfolio_data = {
                 "career_role": "Professional Learner",
@@ -407,26 +505,31 @@ async def analyze_portfolio(request: ChatRequest):
             }
     except Exception as parse_error:
         print(f"JSON Parse Error: {parse_error}")
-        portfolio_data = {
-            "career_role": "Professional Learner",
-            "skills": "Learning, Communication, Problem Solving",
-            "summary": analysis_result[:200] if analysis_result else "Unable to generate summary."
-        }
+        if previous and previous.get("career_role"):
+            portfolio_data = dict(previous)
+        else:
+            portfolio_data = {
+                "career_role": "Professional Learner",
+                "skills": "Learning, Communication, Problem Solving",
+                "summary": analysis_result[:200] if analysis_result else "Unable to generate summary."
+            }
     
     career_role = portfolio_data.get("career_role", "Professional Learner")
     skills = portfolio_data.get("skills", "Learning, Communication")
     summary = portfolio_data.get("summary", "Unable to generate summary.")
     
-    # 5. Save to student_portfolios table
-    save_success = await asyncio.to_thread(
-        save_portfolio,
+    # 5. Save to student_portfolios table, advancing the watermark
+    save_success = await save_portfolio(
         request.user_id,
         career_role,
         skills,
-        summary
+        summary,
+        analyzed_until=chat_logs[-1].get("created_at"),
     )
     
     if save_success:
+        candidate_search.upsert_portfolio(request.user_id, career_role, skills)
+        portfolio_matcher.upsert_portfolio(request.user_id, career_role, skills, summary)
         return {
             "success": True,
             "career_role": career_role,
@@ -3,9 +3,11 @@ from fastapi import APIRouter, Depends, Request
 from backend.app.Schemas.schemas import ForgotPasswordRequest, UserLogin, UserRegister
 from backend.app.core.db_utility import get_async_session
 from backend.app.services.authentication_service import (
+    deactivate_user,
     forgot_password,
     login_user as login_user_service,
     logout_user as logout_user_service,
+    reactivate_user,
     register_user as register_user_service,
 )
 
@@ -27,6 +29,16 @@ async def reset_password(payload: ForgotPasswordRequest, session=Depends(get_asy
     return await forgot_password(payload.email, session, payload.new_password)
 
 
+@router.post("/deactivate")
+async def deactivate(request: Request, session=Depends(get_async_session)):
+    return await deactivate_user(request, session)
+
+
+@router.post("/reactivate")
+async def reactivate(user: UserLogin, session=Depends(get_async_session)):
+    return await reactivate_user(user, session)
+
+
 @router.post("/logout")
 async def logout(request: Request):
     return await logout_user_service(request)
@@ -0,0 +1,107 @@
+import hashlib
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from backend.app.Schemas.schemas import ChatRequest
+from backend.app.core.admission import rate_limit
+from backend.app.core.config import settings
+from backend.app.core.sse import sse_response
+from backend.app.middleware.AuthenticationMiddleware import current_user_id
+from backend.app.routes.v1.agent_route import analyze_portfolio, generate_roadmap
+from backend.app.services.job_queue import FINISHED, JobQueueFull, job_queue
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+# The job handlers run the same code as the synchronous endpoints.
+
+async def _portfolio_job(payload: dict):
+    return await analyze_portfolio(ChatRequest(**payload))
+
+
+async def _roadmap_job(payload: dict):
+    return await generate_roadmap(ChatRequest(**payload))
+
+
+job_queue.register("portfolio-analysis", _portfolio_job)
+job_queue.register("roadmap", _roadmap_job)
+
+
+def _accepted(job) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events",
+        },
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+async def _owned_job(job_id: str, owner: str):
+    """The job, or 404 when it does not exist or another user submitted it."""
+    job = await job_queue.get(job_id)
+    if job is None or job.user_id != owner:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _busy_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"message": "Too many queued jobs, please try again shortly"},
+        headers={"Retry-After": "5"},
+    )
+
+
+@router.post("/portfolio-analysis", dependencies=[Depends(rate_limit)])
+async def submit_portfolio_analysis(request: ChatRequest, owner: str = Depends(current_user_id)):
+    """Queue a portfolio analysis; one per user can be pending at a time"""
+    try:
+        job = await job_queue.submit("portfolio-analysis", owner, request.model_dump())
+    except JobQueueFull:
+        return _busy_response()
+    return _accepted(job)
+
+
+@router.post("/roadmap", dependencies=[Depends(rate_limit)])
+async def submit_roadmap(request: ChatRequest, owner: str = Depends(current_user_id)):
+    """Queue a roadmap generation; repeats of a pending request share its job"""
+    message_key = hashlib.blake2b(request.message.strip().lower().encode("utf-8"), digest_size=12).hexdigest()
+    try:
+        job = await job_queue.submit("roadmap", owner, request.model_dump(), dedupe_key=message_key)
+    except JobQueueFull:
+        return _busy_response()
+    return _accepted(job)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, owner: str = Depends(current_user_id)):
+    job = await _owned_job(job_id, owner)
+    return job.public()
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request, owner: str = Depends(current_user_id)):
+    """Server-Sent Events: one ``status`` event per state change, ending with the job"""
+    await _owned_job(job_id, owner)
+
+    async def events():
+        last_status = None
+        while True:
+            job = await job_queue.get(job_id)
+            if job is None:
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield "status", job.public()
+            if job.status in FINISHED:
+                return
+            # Re-read on timeout too: with a shared store the job may be run
+            # by another worker process.
+            await job_queue.wait_for_change(job_id, settings.SSE_HEARTBEAT_SECONDS)
+
+    return sse_response(events(), request)
@@ -7,8 +7,17 @@ from starlette import status
 from backend.app.core.config import settings
 from backend.app.models.psql_model import User
 from backend.app.Schemas.schemas import UserLogin, UserRegister
-from backend.app.services.jwt_service import generate_access_token, generate_refresh_token
-from backend.app.services.password_hashing import hash_password, verify_password
+from backend.app.services.jwt_service import generate_access_token, generate_refresh_token, token_subject
+from backend.app.services.password_hashing import HashingQueueFull, hash_password, verify_and_update
+from backend.app.services.user_cache import user_cache
+
+
+def _busy_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"message": "Too many requests, please try again shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 
 async def get_user_by_email(email: str, session: AsyncSession) -> User | None:
@@ -25,7 +34,10 @@ async def register_user(payload: UserRegister, session: AsyncSession):
             content={"message": "User already exists"},
         )
 
-    hashed_password = await hash_password(payload.password)
+    try:
+        hashed_password = await hash_password(payload.password)
+    except HashingQueueFull:
+        return _busy_response()
     new_user = User(username=payload.username, email=payload.email, password=hashed_password)
 
     session.add(new_user)
@@ -46,13 +58,21 @@ async def login_user(payload: UserLogin, session: AsyncSession):
             content={"message": "Invalid email or password"},
         )
 
-    is_valid = await verify_password(payload.password, user.password)
+    try:
+        is_valid, new_hash = await verify_and_update(payload.password, user.password)
+    except HashingQueueFull:
+        return _busy_response()
     if not is_valid:
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={"message": "Invalid email or password"},
         )
 
+    # The stored hash used an outdated bcrypt cost; keep the upgraded one.
+    if new_hash:
+        user.password = new_hash
+        await session.commit()
+
     access_token = await generate_access_token({"sub": str(user.id)})
     refresh_token = await generate_refresh_token({"sub": str(user.id)})
 
@@ -89,14 +109,84 @@ async def forgot_password(email: str, session: AsyncSession, new_password: str):
             content={"message": "User does not exist"},
         )
 
-    user.password = await hash_password(new_password)
+    try:
+        user.password = await hash_password(new_password)
+    except HashingQueueFull:
+        return _busy_response()
     await session.commit()
     await session.refresh(user)
+    user_cache.invalidate_user(user.id)
     return JSONResponse(
         status_code=status.HTTP_200_OK, content={"message": "Password reset"}
     )
 
 
+async def set_user_active(user_id: int, is_active: bool, session: AsyncSession) -> User | None:
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+
+    user.is_active = is_active
+    await session.commit()
+    # AuthenticationMiddleware rejects inactive users; drop the cached copy
+    # so the change applies to the very next request.
+    user_cache.invalidate_user(user.id)
+    return user
+
+
+async def deactivate_user(request: Request, session: AsyncSession):
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    else:
+        token = request.cookies.get("access_token")
+    subject = token_subject(token) if token else None
+    if subject is None or not subject.isdigit():
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"message": "Invalid token"},
+        )
+
+    user = await set_user_active(int(subject), False, session)
+    if user is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"message": "User does not exist"},
+        )
+
+    response = JSONResponse(
+        status_code=status.HTTP_200_OK, content={"message": "Account deactivated"}
+    )
+    response.delete_cookie(key="access_token")
+    response.delete_cookie(key="refresh_token")
+    return response
+
+
+async def reactivate_user(payload: UserLogin, session: AsyncSession):
+    user = await get_user_by_email(payload.email, session)
+    if not user:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"message": "Invalid email or password"},
+        )
+
+    try:
+        is_valid, _ = await verify_and_update(payload.password, user.password)
+    except HashingQueueFull:
+        return _busy_response()
+    if not is_valid:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"message": "Invalid email or password"},
+        )
+
+    await set_user_active(user.id, True, session)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK, content={"message": "Account reactivated"}
+    )
+
+
 async def logout_user(request: Request):
     user = request.cookies.get("access_token")
     if not user:
@@ -0,0 +1,253 @@
+"""In-memory skill search over candidates and student portfolios.
+
+Every candidate (``candidates`` table) and student (``student_portfolios``)
+is a document with a dense integer id. Each normalized skill maps to a
+roaring bitmap of the documents that list it, so a query never touches
+documents that share no skill with it.
+
+Ranking is a weighted overlap: every matched skill contributes its inverse
+document frequency, so rare skills count for more than ubiquitous ones. Ties
+go to the document indexed first, which after a full rebuild means the higher
+stored ``match_score``.
+"""
+import asyncio
+import heapq
+import math
+import re
+import unicodedata
+from typing import Hashable, Iterable
+
+from pyroaring import BitMap
+
+from backend.app.database.storage import get_all_candidates, get_all_portfolios
+
+# Query skills beyond this many (least specific first) are ignored.
+MAX_QUERY_SKILLS = 10
+# Below this many matching documents, scoring them one by one is cheapest.
+DIRECT_SCORING_LIMIT = 4096
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "py": "python",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+}
+
+
+def normalize_skill(skill: str) -> str:
+    skill = unicodedata.normalize("NFKC", skill).casefold().strip()
+    skill = re.sub(r"\s+", " ", skill)
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def split_skills(skills) -> list[str]:
+    """Normalized, de-duplicated skills from a comma-separated string or a list."""
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    seen = []
+    for skill in skills or []:
+        norm = normalize_skill(str(skill))
+        if norm and norm not in seen:
+            seen.append(norm)
+    return seen
+
+
+class SkillIndex:
+    """Inverted index from normalized skill to a bitmap of document ids."""
+
+    def __init__(self):
+        self._postings: dict[str, BitMap] = {}
+        self._doc_ids: dict[Hashable, int] = {}
+        self._records: list[dict | None] = []
+        self._doc_skills: list[tuple[str, ...]] = []
+        self._live = BitMap()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def upsert(self, key: Hashable, skills: Iterable[str], record: dict):
+        """Add a document or replace the skills and record of an existing one."""
+        skills = tuple(split_skills(list(skills)))
+        doc = self._doc_ids.get(key)
+        if doc is None:
+            doc = len(self._records)
+            self._doc_ids[key] = doc
+            self._records.append(None)
+            self._doc_skills.append(())
+        else:
+            self._unlink(doc)
+
+        for skill in skills:
+            self._postings.setdefault(skill, BitMap()).add(doc)
+        self._records[doc] = record
+        self._doc_skills[doc] = skills
+        self._live.add(doc)
+
+    def remove(self, key: Hashable):
+        doc = self._doc_ids.pop(key, None)
+        if doc is not None:
+            self._unlink(doc)
+            self._records[doc] = None
+            self._live.discard(doc)
+
+    def _unlink(self, doc: int):
+        for skill in self._doc_skills[doc]:
+            postings = self._postings.get(skill)
+            if postings is not None:
+                postings.discard(doc)
+                if not postings:
+                    del self._postings[skill]
+        self._doc_skills[doc] = ()
+
+    def weight(self, skill: str) -> float:
+        df = len(self._postings.get(skill, ()))
+        return math.log(1 + len(self._live) / df) if df else 0.0
+
+    def search(self, skills: Iterable[str], k: int = 10) -> list[dict]:
+        terms = [s for s in split_skills(list(skills)) if s in self._postings]
+        if not terms or k <= 0:
+            return []
+        terms.sort(key=self.weight, reverse=True)
+        terms = terms[:MAX_QUERY_SKILLS]
+        weights = {t: self.weight(t) for t in terms}
+
+        postings = [self._postings[t] for t in terms]
+        matching = BitMap.union(*postings) if len(postings) > 1 else postings[0]
+        if len(matching) <= DIRECT_SCORING_LIMIT:
+            scored = self._score_directly(matching, weights, k)
+        else:
+            scored = self._score_by_subsets(terms, weights, k)
+
+        total = sum(weights.values())
+        results = []
+        for score, doc in scored:
+            matched = [t for t in terms if t in self._doc_skills[doc]]
+            results.append({
+                **self._records[doc],
+                "score": round(score / total, 4),
+                "matched_skills": matched,
+            })
+        return results
+
+    def _score_directly(self, docs: BitMap, weights: dict, k: int):
+        def score(doc):
+            return sum(weights.get(s, 0.0) for s in self._doc_skills[doc])
+        best = heapq.nsmallest(k, docs, key=lambda doc: (-score(doc), doc))
+        return [(score(doc), doc) for doc in best]
+
+    def _score_by_subsets(self, terms: list[str], weights: dict, k: int):
+        """Walk combinations of query skills from the heaviest down.
+
+        A document's score is fixed by exactly which query skills it has, and a
+        superset of skills always weighs more than any of its subsets. So when
+        subsets are visited by descending weight, the intersection of a subset's
+        postings minus everything already taken holds exactly the documents
+        whose matched set is that subset, and the walk can stop after ``k``.
+        """
+        masks = range(1, 1 << len(terms))
+        mask_weight = {
+            m: sum(weights[t] for i, t in enumerate(terms) if m >> i & 1) for m in masks
+        }
+        taken = BitMap()
+        scored = []
+        for mask in sorted(masks, key=lambda m: (-mask_weight[m], m)):
+            postings = [self._postings[t] for i, t in enumerate(terms) if mask >> i & 1]
+            exact = BitMap.intersection(*postings) - taken if len(postings) > 1 else postings[0] - taken
+            if not exact:
+                continue
+            need = k - len(scored)
+            for doc in exact[:need] if len(exact) > need else exact:
+                scored.append((mask_weight[mask], doc))
+            if len(scored) >= k:
+                break
+            taken |= exact
+        return scored
+
+
+def candidate_record(row: dict) -> dict:
+    return {
+        "type": "candidate",
+        "id": row.get("id"),
+        "name": row.get("name"),
+        "role": row.get("role"),
+        "location": row.get("location"),
+        "skills": split_skills(row.get("skills")),
+        "match_score": row.get("match_score"),
+    }
+
+
+def portfolio_record(user_id: str, career_role: str, skills) -> dict:
+    return {
+        "type": "student",
+        "user_id": user_id,
+        "role": career_role,
+        "skills": split_skills(skills),
+    }
+
+
+class CandidateSearch:
+    """Owns the live SkillIndex and keeps it current.
+
+    A rebuild loads everything from the database into a fresh index and swaps
+    it in; portfolio updates that arrive while the rebuild is loading are
+    replayed onto the new index before the swap.
+    """
+
+    def __init__(self):
+        self.index = SkillIndex()
+        self._build_task: asyncio.Task | None = None
+        self._pending: list[tuple] | None = None
+        self.ready = False
+
+    async def rebuild(self):
+        self._pending = []
+        try:
+            candidates = await get_all_candidates()
+            portfolios = await get_all_portfolios()
+
+            index = SkillIndex()
+            for row in candidates:
+                index.upsert(("candidate", row.get("id")), split_skills(row.get("skills")), candidate_record(row))
+            for row in portfolios:
+                index.upsert(
+                    ("student", row.get("user_id")),
+                    split_skills(row.get("skills")),
+                    portfolio_record(row.get("user_id"), row.get("career_role"), row.get("skills")),
+                )
+            for args in self._pending:
+                index.upsert(*args)
+
+            self.index = index
+            self.ready = True
+        finally:
+            self._pending = None
+
+    def start(self):
+        """Build the index in the background (called from the app lifespan)."""
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self.rebuild())
+        return self._build_task
+
+    async def ensure_ready(self):
+        if not self.ready:
+            await asyncio.shield(self.start())
+
+    def upsert_portfolio(self, user_id: str, career_role: str, skills):
+        args = (("student", user_id), split_skills(skills), portfolio_record(user_id, career_role, skills))
+        self.index.upsert(*args)
+        if self._pending is not None:
+            self._pending.append(args)
+
+    async def search(self, skills: Iterable[str], k: int = 10) -> list[dict]:
+        await self.ensure_ready()
+        return self.index.search(skills, k)
+
+
+candidate_search = CandidateSearch()
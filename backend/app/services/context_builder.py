@@ -0,0 +1,209 @@
+"""Conversation context for the chat agents.
+
+``build_messages`` turns one ChatRequest into the message list sent to the
+LLM gateway:
+
+1. the agent's recent ``chat_history`` rows and the client-supplied
+   ``history`` are merged into one de-duplicated list of turns;
+2. the newest turns that fit the model's token budget (after the system
+   prompt, the new message and the answer's ``max_tokens``) are kept as-is;
+3. older turns are represented by a running summary, cached per user and
+   agent. The summary is extended in the background with the turns that
+   fell out of the window, so no request waits for a summarization call.
+
+Every chat agent is listed in ``CONTEXT_AGENTS`` by default; an agent left
+out gets a single-turn prompt. The response caches key on the whole prompt
+(summary and earlier turns included), so cached agents keep their history:
+a follow-up only hits an answer given in the same conversation.
+"""
+import asyncio
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from cachetools import TTLCache
+
+from backend.app.core.config import settings
+from backend.app.database.storage import get_chat_history
+from backend.app.services.llm_cache import estimate_tokens, normalize_message
+from backend.app.services.llm_gateway import LLMUnavailableError, get_llm_gateway
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a student and an AI assistant. "
+    "Merge the new turns into the existing summary. Keep the student's goals, background, "
+    "decisions and open questions. Reply with the updated summary only, at most 150 words."
+)
+
+ROLE_ALIASES = {"user": "user", "human": "user", "assistant": "assistant", "ai": "assistant", "model": "assistant", "bot": "assistant"}
+
+
+def parse_budgets(spec: str) -> dict[str, int]:
+    """``"default:3000,llama-3.1-8b-instant:2000"`` -> {model: tokens}."""
+    budgets = {}
+    for item in spec.split(","):
+        model, _, tokens = item.strip().rpartition(":")
+        if model and tokens.isdigit():
+            budgets[model] = int(tokens)
+    budgets.setdefault("default", 3000)
+    return budgets
+
+
+def _agent_of(agent_type: Optional[str]) -> str:
+    # chat_history labels look like "cofounder" or "Co-founder (gemini)".
+    return re.sub(r"[^a-z]", "", (agent_type or "").lower())
+
+
+def _turn(role, content) -> Optional[dict]:
+    role = ROLE_ALIASES.get(str(role or "").lower())
+    if role is None or not isinstance(content, str) or not content.strip():
+        return None
+    return {"role": role, "content": content}
+
+
+def _fingerprint(turn: dict) -> str:
+    raw = f"{turn['role']}\x00{normalize_message(turn['content'])}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def merge_history(rows: List[dict], client_history: List[dict], agent: str, message: str) -> List[dict]:
+    """Oldest-first turns from stored rows followed by client-only turns."""
+    turns = []
+    for row in reversed(rows):  # rows are newest first
+        if _agent_of(row.get("agent_type")).startswith(agent):
+            turn = _turn(row.get("role"), row.get("message"))
+            if turn:
+                turns.append(turn)
+
+    seen = {_fingerprint(t) for t in turns}
+    for item in client_history or []:
+        if not isinstance(item, dict):
+            continue
+        turn = _turn(item.get("role"), item.get("content") or item.get("message") or item.get("text"))
+        if turn and _fingerprint(turn) not in seen:
+            seen.add(_fingerprint(turn))
+            turns.append(turn)
+
+    # The new message may already have been logged; it is sent separately.
+    current = _fingerprint({"role": "user", "content": message})
+    while turns and _fingerprint(turns[-1]) == current:
+        turns.pop()
+    return turns
+
+
+@dataclass
+class _Summary:
+    text: str = ""
+    upto: Optional[str] = None  # fingerprint of the last turn folded in
+
+
+class ContextBuilder:
+    def __init__(
+        self,
+        agents: Optional[set] = None,
+        budgets: Optional[dict] = None,
+        history_rows: int = settings.CONTEXT_HISTORY_ROWS,
+    ):
+        self.agents = agents if agents is not None else {
+            a.strip() for a in settings.CONTEXT_AGENTS.split(",") if a.strip()
+        }
+        self.budgets = budgets or parse_budgets(settings.CONTEXT_TOKEN_BUDGETS)
+        self.history_rows = history_rows
+        self._summaries = TTLCache(
+            maxsize=settings.CONTEXT_SUMMARY_CACHE_SIZE, ttl=settings.CONTEXT_SUMMARY_TTL_SECONDS
+        )
+        self._summarizing: dict[tuple, asyncio.Task] = {}
+        self.summaries_built = 0
+        self.turns_trimmed = 0
+
+    def budget_for(self, model: Optional[str]) -> int:
+        return self.budgets.get(model or "", self.budgets["default"])
+
+    async def has_history(self, agent: str, request) -> bool:
+        """Whether ``request`` continues a conversation ``agent`` keeps context for."""
+        if agent not in self.agents:
+            return False
+        if merge_history([], request.history or [], agent, request.message):
+            return True
+        rows = await get_chat_history(request.user_id, limit=self.history_rows)
+        return bool(merge_history(rows, [], agent, request.message))
+
+    async def build_messages(self, agent: str, system_prompt: str, request) -> List[dict]:
+        current = {"role": "user", "content": request.message}
+        if agent not in self.agents:
+            return [{"role": "system", "content": system_prompt}, current]
+
+        rows = await get_chat_history(request.user_id, limit=self.history_rows)
+        turns = merge_history(rows, request.history or [], agent, request.message)
+
+        gateway = get_llm_gateway()
+        budget = self.budget_for(gateway.model_for(agent))
+        remaining = (
+            budget
+            - estimate_tokens(system_prompt)
+            - estimate_tokens(request.message)
+            - gateway.profile(agent).max_tokens
+        )
+
+        key = (request.user_id, agent)
+        summary = self._summaries.get(key) or _Summary()
+        if summary.text:
+            remaining -= estimate_tokens(summary.text)
+
+        keep = len(turns)
+        while keep > 0:
+            cost = estimate_tokens(turns[keep - 1]["content"])
+            if cost > remaining:
+                break
+            remaining -= cost
+            keep -= 1
+        older, recent = turns[:keep], turns[keep:]
+        self.turns_trimmed += len(older)
+
+        if older:
+            self._schedule_summary(key, summary, older)
+
+        system = system_prompt
+        if summary.text:
+            system += f"\n\nSummary of the earlier conversation:\n{summary.text}"
+        return [{"role": "system", "content": system}, *recent, current]
+
+    def _schedule_summary(self, key: tuple, summary: _Summary, older: List[dict]):
+        fingerprints = [_fingerprint(t) for t in older]
+        if summary.upto in fingerprints:
+            new_turns = older[fingerprints.index(summary.upto) + 1:]
+        else:
+            new_turns = older
+        task = self._summarizing.get(key)
+        if not new_turns or (task is not None and not task.done()):
+            return
+        task = asyncio.create_task(self._summarize(key, summary, new_turns, fingerprints[-1]))
+        self._summarizing[key] = task
+        task.add_done_callback(lambda _: self._summarizing.pop(key, None))
+
+    async def _summarize(self, key: tuple, summary: _Summary, new_turns: List[dict], upto: str):
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in new_turns)
+        prompt = f"Existing summary:\n{summary.text or '(none)'}\n\nNew turns:\n{transcript}"
+        try:
+            result = await get_llm_gateway().complete(
+                "summary",
+                [
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+            )
+        except LLMUnavailableError as e:
+            print(f"Context summary error: {e}")
+            return
+        self._summaries[key] = _Summary(text=result.text.strip(), upto=upto)
+        self.summaries_built += 1
+
+    def stats(self) -> dict:
+        return {
+            "summaries": len(self._summaries),
+            "summaries_built": self.summaries_built,
+            "turns_trimmed": self.turns_trimmed,
+        }
+
+
+context_builder = ContextBuilder()
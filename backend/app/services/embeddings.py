@@ -0,0 +1,57 @@
+"""Local, offline text embeddings.
+
+A signed feature-hashing vectorizer over word unigrams and bigrams with
+sublinear term frequency, L2-normalized so a dot product is a cosine
+similarity. No model download or network call is involved, and vectors for
+the same text are identical across processes and restarts.
+"""
+import math
+import re
+
+import mmh3
+import numpy as np
+
+from backend.app.core.config import settings
+
+_TOKEN = re.compile(r"\w+")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by can do for from get how i i'm in into is it its me my
+of on or our please should so that the their them then this to want we what when
+where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    words = _TOKEN.findall(text.casefold())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = settings.EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        counts: dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token, count in counts.items():
+            h = mmh3.hash(token, signed=False)
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+
+embedder = HashingEmbedder()
@@ -0,0 +1,199 @@
+"""Compiled intent matching in front of the LLM agents.
+
+Every English and Burmese keyword is compiled into one regular expression
+shaped like a trie (shared prefixes are matched once, so the engine never
+tries keywords one by one), and a message is scanned once no matter how
+many intents there are. The scan reports which intents occur and whether
+the keywords (plus filler and function words) cover the whole message.
+
+- ``faq_reply`` answers the ``/api/chat`` support bot: the highest-priority
+  intent found anywhere in the message picks the canned reply. A follow-up
+  without an intent of its own ("when is it due?") is answered for the
+  newest earlier user turn that had one.
+- ``route`` runs before every chat agent and only answers messages that are
+  nothing but a greeting or thanks ("hi", "thank you so much",
+  "ကျေးဇူးတင်ပါတယ်") or an explicit question about where a page is
+  ("where is the assignments page?", "open the courses section"). Anything
+  with real content ("how do I find a job") returns None and goes to the
+  LLM as before. The agents only use it on the first turn of a
+  conversation (see agent_route.canned_or_shed).
+
+Myanmar text is compared after NFC normalization (which makes the order of
+marks such as asat and dot below canonical) with zero-width characters
+removed; keyboards and copy-pasted text differ in both. Myanmar is written
+without spaces between words, so Myanmar keywords match anywhere; English
+keywords only match whole words ("hi" does not match "this").
+"""
+import re
+import unicodedata
+from typing import Optional
+
+from backend.app.services.embeddings import STOP_WORDS
+
+# Intents in priority order (first match wins in faq_reply).
+KEYWORDS: dict[str, list[str]] = {
+    "greeting": [
+        "hello", "hi", "hey", "hiya", "greetings", "good morning", "good afternoon", "good evening",
+        "မင်္ဂလာပါ", "မင်္ဂလာ", "ဟယ်လို", "ဟိုင်း",
+    ],
+    "course": ["course", "courses", "class", "classes", "lecture", "lectures", "သင်တန်း", "ကောက်စာ"],
+    "assignment": ["assignment", "assignments", "homework", "task", "tasks", "အလုပ်", "ပါစီယာ"],
+    "career": ["career", "careers", "job", "jobs", "employment", "အသက်လမ်း", "အလုပ်အကိုင်"],
+    "interview": ["interview", "interviews", "အင်တာဗျူး", "အင်တာဗျူးပြင်ဆင်ခြင်း"],
+    "portfolio": ["portfolio", "portfolios", "project", "projects", "ပရိုဂျက်", "ပါဝါလီအိုက်", "ပို့ဖိုလီယို"],
+    "help": ["help", "help လုပ်ပါး", "ကူညီပါး", "ကူညီပါ", "ကူညီ"],
+    "thanks": [
+        "thanks", "thank you", "thank u", "thx", "ty", "many thanks", "appreciate it",
+        "ကျေးဇူးတင်ပါတယ်", "ကျေးဇူးတင်ပါ", "ကျေးဇူးပါ", "ကျေးဇူး", "ကေးဇူးတင်ပါး",
+    ],
+    # Only used to decide whether a message is trivial or a navigation question:
+    # that takes a "where"/"open" cue *and* a page word next to a page intent.
+    "navigation": ["where", "open", "go to", "take me to", "ဘယ်မှာ", "ဘယ်နေရာ"],
+    "page": ["page", "pages", "section", "dashboard", "menu", "tab", "စာမျက်နှာ"],
+    "filler": [
+        "please", "pls", "there", "so much", "very much", "much", "ok", "okay", "again", "everyone",
+        "all", "bro", "sir", "teacher", "a lot", "ပါတယ်", "ပါ", "တယ်", "နော်", "ရှင့်", "ရှင်",
+        "ခင်ဗျာ", "ဗျာ", "ဗျ", "ဆရာ", "လဲ", "လား",
+    ],
+}
+
+PAGE_INTENTS = ("course", "assignment", "career", "interview", "portfolio")
+
+REPLIES = {
+    "greeting": "Hello! I'm your AI learning assistant. How can I help you today? You can ask me about courses, assignments, career guidance, or any questions about your learning journey.",
+    "course": "I can help you with courses! Check out the Courses section in your dashboard to browse available courses. You can enroll in courses that match your career goals.",
+    "assignment": "Looking for assignments? Visit the Assignments page to see your pending tasks. Make sure to submit them before the deadline!",
+    "career": "For career guidance, check out the Career page. We offer AI-powered career recommendations, job listings, and interview preparation tools.",
+    "interview": "Visit the AI Interview Practice page to prepare for interviews. You can practice with mock interviews and get AI-powered feedback on your responses.",
+    "portfolio": "Build your portfolio in the AI Portfolio section. Showcase your projects and skills to potential employers.",
+    "help": "I'm here to help! You can ask me about:\n- Courses and enrollments\n- Assignments and deadlines\n- Career guidance\n- Interview preparation\n- Portfolio building\n- General questions about EduBridge AI",
+    "thanks": "You're welcome! Feel free to ask if you have more questions. I'm always here to help!",
+}
+DEFAULT_REPLY = "I'm here to help! Try asking about courses, assignments, career guidance, interview preparation, or portfolio building. You can also ask me for general help!"
+
+AGENT_GREETINGS = {
+    "cofounder": "Hello! I'm your AI co-founder. Tell me about your business idea or goal and I'll help you turn it into a step-by-step roadmap.",
+    "mentor": "Hello! I'm your interview mentor. Tell me about your background, your skills and the job you're aiming for, and we'll practice together.",
+    "support": "Hello! How can I help you today? Ask me anything about EduBridge AI.",
+    "roadmap": "Hello! Tell me the career or business goal you want to reach and I'll generate a step-by-step roadmap for it.",
+}
+
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+
+
+def normalize_text(text: str) -> str:
+    """NFC (which also puts Myanmar dot below before asat), casefolded, zero-width characters removed."""
+    return unicodedata.normalize("NFC", text).translate(_ZERO_WIDTH).casefold()
+
+
+def _is_content(ch: str) -> bool:
+    return ch.isalnum() or unicodedata.category(ch)[0] == "M"
+
+
+def _trie_pattern(words) -> str:
+    """Regex matching any of ``words``, longest first, with shared prefixes factored out."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        ends = "" in node
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy: the longer keyword wins, the shorter one is the fallback.
+        if ends:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+def _compile(keywords: dict[str, list[str]]):
+    # A word listed twice keeps its first intent; function words come last.
+    words: dict[str, str] = {}
+    for intent, listed in keywords.items():
+        for word in listed:
+            words.setdefault(normalize_text(word), intent)
+    for word in STOP_WORDS:
+        words.setdefault(word, "stop")
+
+    # English keywords must be whole words; Myanmar ones match anywhere.
+    latin = [word for word in words if word.isascii()]
+    other = [word for word in words if not word.isascii()]
+    pattern = re.compile(
+        rf"(?<![a-z0-9])(?:{_trie_pattern(latin)})(?![a-z0-9])|{_trie_pattern(other)}"
+    )
+    return pattern, words
+
+
+class IntentRouter:
+    def __init__(self, keywords: dict[str, list[str]] = KEYWORDS):
+        self._priority = [intent for intent in keywords if intent in REPLIES]
+        self._pattern, self._words = _compile(keywords)
+        self.scanned = 0
+        self.routed: dict[str, int] = {}
+
+    def scan(self, message: str) -> tuple[set, bool]:
+        """Intents found in ``message`` and whether keywords cover all of its content."""
+        self.scanned += 1
+        text = normalize_text(message)
+        found, covered, position = set(), True, 0
+        for match in self._pattern.finditer(text):
+            if covered and any(_is_content(ch) for ch in text[position:match.start()]):
+                covered = False
+            found.add(self._words[" ".join(match.group().split())])
+            position = match.end()
+        if covered and any(_is_content(ch) for ch in text[position:]):
+            covered = False
+        return found, covered
+
+    def faq_reply(self, message: str, earlier: Optional[list[str]] = None) -> str:
+        """Canned reply for the support chatbot (``/api/chat``).
+
+        ``earlier`` holds the user's previous messages, oldest first.
+        """
+        for text in [message, *reversed(earlier or [])]:
+            found, _ = self.scan(text)
+            for intent in self._priority:
+                if intent in found:
+                    return REPLIES[intent]
+        return DEFAULT_REPLY
+
+    def route(self, agent: str, message: str) -> Optional[str]:
+        """Canned reply when ``message`` needs no LLM, else None."""
+        found, covered = self.scan(message)
+        if not covered:
+            return None
+
+        if "navigation" in found and "page" in found:
+            pages = [intent for intent in PAGE_INTENTS if intent in found]
+            intent = pages[0] if len(pages) == 1 else None
+        elif found & {"greeting", "thanks"} and not found & {*PAGE_INTENTS, "help"}:
+            intent = "greeting" if "greeting" in found else "thanks"
+        else:
+            intent = None
+        if intent is None:
+            return None
+
+        self.routed[intent] = self.routed.get(intent, 0) + 1
+        if intent == "greeting":
+            return AGENT_GREETINGS.get(agent, REPLIES["greeting"])
+        return REPLIES[intent]
+
+    def stats(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "routed": sum(self.routed.values()),
+            **{f"routed_{intent}": count for intent, count in self.routed.items()},
+        }
+
+
+intent_router = IntentRouter()
@@ -0,0 +1,265 @@
+"""Background jobs for long-running AI work.
+
+A request is accepted as a job and answered immediately with its id; a
+bounded pool of worker tasks runs the job and clients fetch the result by
+polling ``GET /jobs/{id}`` or by following ``GET /jobs/{id}/events`` (SSE).
+Both only answer the authenticated user that submitted the job.
+
+Submitting a job that is identical to one still queued or running for the
+same user (same kind and dedupe key) returns the existing job instead of
+queueing the work twice.
+
+Job state lives in a JobStore: in memory (one process) or in SQLite
+(``JOB_STORE=sqlite``), which lets every worker process on a host see the
+same jobs.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from backend.app.core.config import settings
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user_id: str
+    dedupe_key: str
+    payload: dict
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def public(self) -> dict:
+        data = asdict(self)
+        data.pop("payload")
+        data.pop("dedupe_key")
+        return data
+
+
+# ========================
+# Stores
+# ========================
+
+class MemoryJobStore:
+    def __init__(self, result_ttl: float = settings.JOB_RESULT_TTL_SECONDS):
+        self.result_ttl = result_ttl
+        self._jobs: dict[str, Job] = {}
+
+    async def save(self, job: Job):
+        self._jobs[job.id] = job
+        if job.status in FINISHED:
+            self._purge()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _purge(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def close(self):
+        pass
+
+
+class SQLiteJobStore:
+    def __init__(self, path: str = settings.JOB_STORE_PATH, result_ttl: float = settings.JOB_RESULT_TTL_SECONDS):
+        self.result_ttl = result_ttl
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, finished_at REAL)"
+            )
+            self._conn.commit()
+
+    def _save(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, finished_at) VALUES (?, ?, ?)",
+                (job.id, json.dumps(asdict(job), ensure_ascii=False, default=str), job.finished_at),
+            )
+            if job.status in FINISHED:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.result_ttl,)
+                )
+            self._conn.commit()
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    async def save(self, job: Job):
+        await asyncio.to_thread(self._save, job)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def build_job_store():
+    if settings.JOB_STORE == "sqlite":
+        try:
+            return SQLiteJobStore()
+        except Exception as e:
+            print(f"Job store: SQLite unavailable ({e}), using memory")
+    return MemoryJobStore()
+
+
+# ========================
+# Queue
+# ========================
+
+Handler = Callable[[dict], Awaitable[Any]]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        store=None,
+        workers: int = settings.JOB_WORKERS,
+        max_queue: int = settings.JOB_MAX_QUEUE,
+        timeout: float = settings.JOB_TIMEOUT_SECONDS,
+    ):
+        self.store = store if store is not None else build_job_store()
+        self.workers = workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[Job] | None = None  # created by start(), in the running loop
+        self._handlers: dict[str, Handler] = {}
+        self._active: dict[tuple, str] = {}  # (kind, user_id, dedupe_key) -> job id
+        self._changed: dict[str, set[asyncio.Event]] = {}  # job id -> waiters
+        self._tasks: list[asyncio.Task] = []
+        self.submitted = 0
+        self.deduplicated = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: Handler):
+        self._handlers[kind] = handler
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def submit(self, kind: str, user_id: str, payload: dict, dedupe_key: str = "") -> Job:
+        active_key = (kind, user_id, dedupe_key)
+        job_id = self._active.get(active_key)
+        if job_id is not None:
+            job = await self.store.get(job_id)
+            if job is not None and job.status not in FINISHED:
+                self.deduplicated += 1
+                return job
+
+        if self._queue is None:
+            raise RuntimeError("job queue is not started")
+        if self._queue.full():
+            raise JobQueueFull(f"{self._queue.qsize()} jobs queued")
+        job = Job(id=uuid.uuid4().hex, kind=kind, user_id=user_id, dedupe_key=dedupe_key, payload=payload)
+        await self.store.save(job)
+        self._active[active_key] = job.id
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> bool:
+        """Wait until the job changes state in this process (or ``timeout``)."""
+        event = asyncio.Event()
+        waiters = self._changed.setdefault(job_id, set())
+        waiters.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters.discard(event)
+            if not waiters and self._changed.get(job_id) is waiters:
+                del self._changed[job_id]
+
+    async def _update(self, job: Job):
+        await self.store.save(job)
+        for event in self._changed.pop(job.id, ()):
+            event.set()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status, job.started_at = RUNNING, time.time()
+        await self._update(job)
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await self._handlers[job.kind](job.payload)
+            if isinstance(result, dict) and result.get("error"):
+                # The endpoints report failure as {"error": ...} rather than raising.
+                print(f"Job {job.kind} {job.id} failed: {result['error']}")
+                job.status, job.error = FAILED, str(result["error"])
+                self.failed += 1
+            else:
+                job.status, job.result = SUCCEEDED, result
+                self.succeeded += 1
+        except Exception as e:
+            print(f"Job {job.kind} {job.id} failed: {e!r}")
+            job.status, job.error = FAILED, str(e) or type(e).__name__
+            self.failed += 1
+        finally:
+            job.finished_at = time.time()
+            self._active.pop((job.kind, job.user_id, job.dedupe_key), None)
+            await self._update(job)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": len(self._tasks),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+job_queue = JobQueue()
@@ -1,3 +1,5 @@
+import uuid
+
 from fastapi import HTTPException
 from jose import jwt, JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta
@@ -6,14 +8,16 @@ from starlette import status
 
 async def generate_access_token(data: dict) -> str:
     cp_data = data.copy()
-    expires_in = datetime.now() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    cp_data.update({"exp": expires_in, "type": "access"})
+    issued_at = datetime.now()
+    expires_in = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    cp_data.update({"exp": expires_in, "iat": issued_at, "jti": uuid.uuid4().hex, "type": "access"})
     return jwt.encode(cp_data, settings.SECRET_KEY, settings.ALGORITHM)
 
 async def generate_refresh_token(data: dict) -> str:
     cp_data = data.copy()
-    expires_in = datetime.now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    cp_data.update({"exp": expires_in, "type": "refresh"})
+    issued_at = datetime.now()
+    expires_in = issued_at + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    cp_data.update({"exp": expires_in, "iat": issued_at, "jti": uuid.uuid4().hex, "type": "refresh"})
     return jwt.encode(cp_data, settings.SECRET_KEY, settings.ALGORITHM)
 
 async def decode_token(token:str) -> dict:
@@ -34,3 +38,10 @@ async def decode_token(token:str) -> dict:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+def token_subject(token: str) -> str | None:
+    """``sub`` of a valid token, or None; never raises (used for rate-limit keys)."""
+    try:
+        return str(jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub") or "") or None
+    except JWTError:
+        return None
@@ -0,0 +1,240 @@
+"""Exact-match cache for LLM answers.
+
+Entries are keyed by (agent, model, context hash, normalized user
+message). The context hash covers the system prompt (including any
+conversation summary) and every earlier turn, so a changed system prompt,
+model or conversation never serves an old answer, while a first turn is
+shared by everyone who asks it. Only agents listed in ``LLM_CACHE_AGENTS``
+are cached.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+from backend.app.core.config import settings
+
+
+def normalize_message(message: str) -> str:
+    """NFKC, lowercase, whitespace collapsed, trailing punctuation dropped."""
+    text = " ".join(unicodedata.normalize("NFKC", message).lower().split())
+    return text.rstrip(" ?!.။")
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast provider-independent token estimate.
+
+    About 4 characters per token for ASCII text; other scripts (Myanmar in
+    particular) tokenize far less efficiently, so count ~1.5 characters each.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return max(1, ascii_chars // 4 + int((len(text) - ascii_chars) / 1.5))
+
+
+def split_prompt(messages: List[dict]) -> Optional[tuple[str, str]]:
+    """``(context hash, user message)`` of a request, or ``None`` when it
+    does not end with a user message and must not be cached.
+
+    The context hash covers the system prompt and the earlier turns, so a
+    follow-up question is only matched within the same conversation.
+    """
+    if not messages or messages[-1]["role"] != "user":
+        return None
+    context = [
+        [m["role"], m["content"] if m["role"] == "system" else normalize_message(m["content"])]
+        for m in messages[:-1]
+    ]
+    raw = json.dumps(context, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest(), messages[-1]["content"]
+
+
+def cache_key(agent: str, model: str, messages: List[dict]) -> Optional[str]:
+    """Key for a request, or ``None`` if it must not be cached."""
+    prompt = split_prompt(messages)
+    if prompt is None:
+        return None
+    context_hash, user = prompt
+    raw = json.dumps([agent, model, context_hash, normalize_message(user)], ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+
+
+# ========================
+# Backends
+# ========================
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def put(self, key: str, value: dict, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def close(self):
+        self._entries.clear()
+
+
+class SQLiteBackend:
+    """SQLite file shared across restarts (and across workers on one host).
+
+    LRU order is kept in ``last_used``; the least recently used rows are
+    deleted once the table grows past ``max_entries``.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def _get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def _put(self, key: str, value: dict, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, value: dict, ttl: float):
+        await asyncio.to_thread(self._put, key, value, ttl)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def build_backend(kind: str = settings.LLM_CACHE_BACKEND):
+    if kind == "sqlite":
+        try:
+            return SQLiteBackend(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            print(f"LLM cache: SQLite backend unavailable ({e}), using memory")
+    return MemoryBackend(settings.LLM_CACHE_MAX_ENTRIES)
+
+
+# ========================
+# Cache
+# ========================
+
+class LLMResponseCache:
+    """Per-agent opt-in response cache with hit and cost-saved accounting."""
+
+    def __init__(
+        self,
+        backend,
+        agents: Optional[set] = None,
+        ttl: float = settings.LLM_CACHE_TTL_SECONDS,
+        cost_per_1k_tokens: float = settings.LLM_CACHE_COST_PER_1K_TOKENS,
+    ):
+        self.backend = backend
+        self.agents = set(agents or ())
+        self.ttl = ttl
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def enabled_for(self, agent: str) -> bool:
+        return agent in self.agents
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            print(f"LLM cache read error: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.tokens_saved += value.get("tokens", 0)
+        return value
+
+    async def put(self, key: str, text: str, provider: str, model: str, messages: List[dict]):
+        tokens = sum(estimate_tokens(m["content"]) for m in messages) + estimate_tokens(text)
+        value = {"text": text, "provider": provider, "model": model, "tokens": tokens}
+        try:
+            await self.backend.put(key, value, self.ttl)
+        except Exception as e:
+            print(f"LLM cache write error: {e}")
+
+    def close(self):
+        self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "cost_saved": self.tokens_saved / 1000 * self.cost_per_1k_tokens,
+        }
+
+
+def build_llm_cache() -> LLMResponseCache:
+    agents = {a.strip() for a in settings.LLM_CACHE_AGENTS.split(",") if a.strip()}
+    return LLMResponseCache(build_backend(), agents)
@@ -0,0 +1,529 @@
+"""Async gateway in front of every LLM provider used by the agents.
+
+Each provider keeps one pooled HTTP/2 client for the lifetime of the process,
+every call runs under a deadline, and an agent's request fails over through a
+fixed provider order when the current provider errors out or stalls.
+
+The gateway only needs OpenAI-compatible or Gemini endpoints, so it can be
+pointed at a local fake server by overriding the ``*_BASE_URL`` settings or by
+passing providers directly::
+
+    gateway = LLMGateway({"groq": OpenAICompatibleProvider(
+        "groq", api_key="test", base_url="http://127.0.0.1:9000/v1", model="fake",
+    )})
+"""
+import asyncio
+import contextlib
+import json
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from backend.app.core.admission import ConcurrencyLimiter, Overloaded, parse_limits
+from backend.app.core.clients import clients
+from backend.app.core.config import settings
+from backend.app.core.metrics import (
+    LLM_CACHE_HITS,
+    LLM_REQUEST_DURATION,
+    LLM_TIME_TO_FIRST_TOKEN,
+    LLM_TOKENS_STREAMED,
+)
+from backend.app.core.singleflight import SingleFlight
+from backend.app.services.llm_cache import LLMResponseCache, build_llm_cache, cache_key, estimate_tokens
+from backend.app.services.semantic_cache import SemanticCache, build_semantic_cache
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no provider in the failover chain produced an answer."""
+
+
+class LLMOverloaded(LLMUnavailableError):
+    """Raised when every provider in the chain is at its concurrency limit."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class AgentProfile:
+    """Sampling settings and preferred provider for one agent."""
+    primary: str
+    temperature: float
+    max_tokens: int
+
+
+AGENT_PROFILES: Dict[str, AgentProfile] = {
+    "cofounder": AgentProfile(primary="gemini", temperature=0.7, max_tokens=800),
+    "mentor": AgentProfile(primary="groq", temperature=0.4, max_tokens=500),
+    "support": AgentProfile(primary="groq", temperature=0.3, max_tokens=400),
+    "roadmap": AgentProfile(primary="gemini", temperature=0.6, max_tokens=800),
+    "portfolio": AgentProfile(primary="gemini", temperature=0.4, max_tokens=500),
+    "summary": AgentProfile(primary="groq", temperature=0.2, max_tokens=300),
+}
+
+
+@dataclass
+class LLMResult:
+    text: str
+    provider: str
+    model: str
+    latency: float
+    cached: bool = False
+
+
+# SDK imports are deferred to provider construction to keep app import fast.
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=60,
+    )
+
+
+def _http_timeout():
+    import httpx
+
+    return httpx.Timeout(
+        settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        connect=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+def extract_gemini_text(response, strip: bool = True) -> str:
+    """Pull the text out of a Gemini response or streamed chunk.
+
+    Streamed chunks are passed with ``strip=False`` so the whitespace between
+    consecutive chunks is preserved.
+    """
+    try:
+        text = ""
+        if hasattr(response, "text") and response.text:
+            text = response.text
+
+        elif hasattr(response, "candidates") and response.candidates:
+            parts = response.candidates[0].content.parts or []
+            text = "".join(
+                [p.text for p in parts if getattr(p, "text", None)]
+            )
+
+        return text.strip() if strip else text
+
+    except Exception:
+        return ""
+
+
+# ========================
+# PROVIDERS
+# ========================
+
+class OpenAICompatibleProvider:
+    """Groq, SiliconFlow or any other OpenAI-compatible chat endpoint."""
+
+    def __init__(self, name: str, api_key: str, base_url: str, model: str):
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.name = name
+        self.model = model
+        self._http = httpx.AsyncClient(
+            http2=True, limits=_http_limits(), timeout=_http_timeout()
+        )
+        # Retries are handled by failing over to the next provider instead.
+        self._client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, http_client=self._http, max_retries=0
+        )
+
+    async def complete(self, messages: List[dict], temperature: float, max_tokens: int) -> str:
+        response = await self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or ""
+
+    async def stream(self, messages: List[dict], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        stream = await self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+class GeminiProvider:
+    """Google Gemini through the google-genai async client."""
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None):
+        from google import genai
+
+        self.name = "gemini"
+        self.model = model
+        http_options = {
+            "api_version": "v1alpha",
+            "timeout": int(settings.LLM_REQUEST_TIMEOUT_SECONDS * 1000),
+            "async_client_args": {"http2": True, "limits": _http_limits()},
+        }
+        if base_url:
+            http_options["base_url"] = base_url
+        self._client = genai.Client(api_key=api_key, http_options=http_options)
+
+    @staticmethod
+    def _to_gemini(messages: List[dict], temperature: float, max_tokens: int):
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        contents = [
+            {
+                "role": "model" if m["role"] == "assistant" else "user",
+                "parts": [{"text": m["content"]}],
+            }
+            for m in messages
+            if m["role"] != "system"
+        ]
+        config = {"temperature": temperature, "max_output_tokens": max_tokens}
+        if system:
+            config["system_instruction"] = system
+        return contents, config
+
+    async def complete(self, messages: List[dict], temperature: float, max_tokens: int) -> str:
+        contents, config = self._to_gemini(messages, temperature, max_tokens)
+        response = await self._client.aio.models.generate_content(
+            model=self.model, contents=contents, config=config
+        )
+        return extract_gemini_text(response)
+
+    async def stream(self, messages: List[dict], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        contents, config = self._to_gemini(messages, temperature, max_tokens)
+        stream = await self._client.aio.models.generate_content_stream(
+            model=self.model, contents=contents, config=config
+        )
+        async for chunk in stream:
+            text = extract_gemini_text(chunk, strip=False)
+            if text:
+                yield text
+
+    async def aclose(self):
+        aclose = getattr(self._client.aio, "aclose", None)
+        if aclose:
+            await aclose()
+
+
+# ========================
+# GATEWAY
+# ========================
+
+@dataclass
+class _ProviderHealth:
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+
+
+class LLMStream:
+    """Async iterator over the text chunks of one streamed answer.
+
+    ``provider`` and ``model`` are filled in once a provider has produced its
+    first token. Failover is only possible before that point.
+    """
+
+    def __init__(self, gateway: "LLMGateway", agent: str, messages: List[dict]):
+        self._gateway = gateway
+        self._agent = agent
+        self._messages = messages
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.cached = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        gateway = self._gateway
+        profile = gateway.profile(self._agent)
+        chain = gateway.chain(self._agent)
+        errors = []
+
+        semantic = gateway.semantic_cache
+        if semantic is not None and not semantic.enabled_for(self._agent):
+            semantic = None
+        if semantic is not None and chain:
+            hit = semantic.get(self._agent, chain[0].model, self._messages)
+            if hit is not None:
+                LLM_CACHE_HITS.labels(self._agent, "semantic").inc()
+                self.provider, self.model, self.cached = hit["provider"], hit["model"], True
+                yield hit["text"]
+                return
+
+        busy = []
+        for provider in chain:
+            # The slot is held until the stream ends, however it ends.
+            slot = contextlib.AsyncExitStack()
+            try:
+                await slot.enter_async_context(gateway.limiters[provider.name].slot())
+            except Overloaded as e:
+                busy.append(e)
+                errors.append(f"{provider.name}: {e}")
+                continue
+
+            start = time.perf_counter()
+            parts = []
+            deadline = asyncio.get_running_loop().time() + gateway.request_timeout
+            chunks = provider.stream(self._messages, profile.temperature, profile.max_tokens)
+            started = False
+            try:
+                while True:
+                    # The first token gets its own, tighter deadline so a stalled
+                    # provider is abandoned while failover is still possible.
+                    if started:
+                        timeout_at = deadline
+                    else:
+                        timeout_at = min(
+                            deadline,
+                            asyncio.get_running_loop().time() + gateway.first_token_timeout,
+                        )
+                    try:
+                        async with asyncio.timeout_at(timeout_at):
+                            text = await anext(chunks)
+                    except StopAsyncIteration:
+                        break
+
+                    if not started:
+                        started = True
+                        self.provider, self.model = provider.name, provider.model
+                        LLM_TIME_TO_FIRST_TOKEN.labels(provider.name, self._agent).observe(
+                            time.perf_counter() - start
+                        )
+                    parts.append(text)
+                    yield text
+
+                if not started:
+                    raise LLMUnavailableError("empty response")
+
+            except Exception as e:
+                gateway.record_failure(provider, e, self._agent, "stream", time.perf_counter() - start)
+                if started:
+                    raise LLMUnavailableError(f"{provider.name} failed mid-stream: {e!r}") from e
+                errors.append(f"{provider.name}: {e!r}")
+                continue
+            finally:
+                await chunks.aclose()
+                await slot.aclose()
+
+            gateway.record_success(provider, self._agent, "stream", time.perf_counter() - start)
+            answer = "".join(parts)
+            LLM_TOKENS_STREAMED.labels(provider.name, self._agent).inc(estimate_tokens(answer))
+            if semantic is not None:
+                semantic.put(self._agent, provider.model, self._messages, answer, provider.name)
+            return
+
+        if busy and len(busy) == len(chain):
+            raise LLMOverloaded(f"all providers busy for {self._agent}: {errors}", busy[-1].retry_after)
+        raise LLMUnavailableError(f"all providers failed for {self._agent}: {errors}")
+
+
+class LLMGateway:
+    """Routes agent requests to providers with deadlines and failover."""
+
+    def __init__(
+        self,
+        providers: Dict[str, object],
+        profiles: Optional[Dict[str, AgentProfile]] = None,
+        failover_order: Optional[List[str]] = None,
+        first_token_timeout: float = settings.LLM_FIRST_TOKEN_TIMEOUT_SECONDS,
+        request_timeout: float = settings.LLM_REQUEST_TIMEOUT_SECONDS,
+        failure_threshold: int = settings.LLM_FAILURE_THRESHOLD,
+        cooldown: float = settings.LLM_COOLDOWN_SECONDS,
+        response_cache: Optional[LLMResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+    ):
+        self.providers = providers
+        self.profiles = profiles or AGENT_PROFILES
+        self.failover_order = failover_order or list(providers)
+        self.first_token_timeout = first_token_timeout
+        self.request_timeout = request_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.response_cache = response_cache
+        self.semantic_cache = semantic_cache
+        self._flight = SingleFlight("llm")
+        self._health: Dict[str, _ProviderHealth] = {name: _ProviderHealth() for name in providers}
+        limits = concurrency or parse_limits(settings.LLM_PROVIDER_CONCURRENCY)
+        self.limiters: Dict[str, ConcurrencyLimiter] = {
+            name: ConcurrencyLimiter(name, limits.get(name, limits.get("default", 32))) for name in providers
+        }
+
+    def profile(self, agent: str) -> AgentProfile:
+        return self.profiles[agent]
+
+    def chain(self, agent: str) -> list:
+        """Providers to try for ``agent``: its primary first, then the failover order.
+
+        Providers that keep failing are skipped until their cooldown expires,
+        unless that would leave nothing to try.
+        """
+        primary = self.profile(agent).primary
+        names = [primary] + [n for n in self.failover_order if n != primary]
+        available = [self.providers[n] for n in names if n in self.providers]
+
+        now = time.monotonic()
+        healthy = [p for p in available if self._health[p.name].open_until <= now]
+        return healthy or available
+
+    def model_for(self, agent: str) -> Optional[str]:
+        """Model the next request for ``agent`` would be sent to."""
+        chain = self.chain(agent)
+        return chain[0].model if chain else None
+
+    def saturated(self, agent: str) -> Optional[float]:
+        """Retry-After seconds when every provider for ``agent`` would reject a new call, else None."""
+        chain = self.chain(agent)
+        limiters = [self.limiters[p.name] for p in chain]
+        if limiters and all(limiter.saturated() for limiter in limiters):
+            return max(limiter.wait_timeout for limiter in limiters)
+        return None
+
+    def admission_stats(self) -> dict:
+        return {
+            f"{name}_{key}": value
+            for name, limiter in self.limiters.items()
+            for key, value in limiter.stats().items()
+        }
+
+    def record_failure(self, provider, error: Exception, agent: str, mode: str, latency: float):
+        LLM_REQUEST_DURATION.labels(provider.name, agent, mode, "error").observe(latency)
+        health = self._health[provider.name]
+        health.consecutive_failures += 1
+        if health.consecutive_failures >= self.failure_threshold:
+            health.open_until = time.monotonic() + self.cooldown
+        print(f"LLM provider {provider.name} failed: {error!r}")
+
+    def record_success(self, provider, agent: str, mode: str, latency: float):
+        LLM_REQUEST_DURATION.labels(provider.name, agent, mode, "ok").observe(latency)
+        health = self._health[provider.name]
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+
+    async def complete(self, agent: str, messages: List[dict]) -> LLMResult:
+        # Identical concurrent requests (same agent, same messages) share one
+        # provider call.
+        key = (agent, json.dumps(messages, ensure_ascii=False, sort_keys=True))
+        return await self._flight.do(key, lambda: self._complete(agent, messages))
+
+    async def _complete(self, agent: str, messages: List[dict]) -> LLMResult:
+        profile = self.profile(agent)
+        chain = self.chain(agent)
+        errors = []
+
+        cache = self.response_cache
+        if cache is not None and not cache.enabled_for(agent):
+            cache = None
+        semantic = self.semantic_cache
+        if semantic is not None and not semantic.enabled_for(agent):
+            semantic = None
+        if chain:
+            # Exact match first; the semantic lookup only runs on a miss.
+            key = cache_key(agent, chain[0].model, messages) if cache is not None else None
+            hit = await cache.get(key) if key else None
+            source = "exact"
+            if hit is None and semantic is not None:
+                hit, source = semantic.get(agent, chain[0].model, messages), "semantic"
+            if hit is not None:
+                LLM_CACHE_HITS.labels(agent, source).inc()
+                return LLMResult(
+                    text=hit["text"], provider=hit["provider"], model=hit["model"], latency=0.0, cached=True
+                )
+
+        busy = []
+        for provider in chain:
+            # Set before the try so the failure path can always time the
+            # attempt; restarted once the slot is held to leave out queueing.
+            start = time.perf_counter()
+            try:
+                async with self.limiters[provider.name].slot():
+                    start = time.perf_counter()
+                    async with asyncio.timeout(self.request_timeout):
+                        text = await provider.complete(messages, profile.temperature, profile.max_tokens)
+                if not text:
+                    raise LLMUnavailableError("empty response")
+            except Overloaded as e:
+                # Busy, not broken: try the next provider without touching its health.
+                busy.append(e)
+                errors.append(f"{provider.name}: {e}")
+                continue
+            except Exception as e:
+                self.record_failure(provider, e, agent, "complete", time.perf_counter() - start)
+                errors.append(f"{provider.name}: {e!r}")
+                continue
+
+            latency = time.perf_counter() - start
+            self.record_success(provider, agent, "complete", latency)
+            if cache is not None:
+                key = cache_key(agent, provider.model, messages)
+                if key:
+                    await cache.put(key, text, provider.name, provider.model, messages)
+            if semantic is not None:
+                semantic.put(agent, provider.model, messages, text, provider.name)
+            return LLMResult(text=text, provider=provider.name, model=provider.model, latency=latency)
+
+        if busy and len(busy) == len(chain):
+            raise LLMOverloaded(f"all providers busy for {agent}: {errors}", busy[-1].retry_after)
+        raise LLMUnavailableError(f"all providers failed for {agent}: {errors}")
+
+    def stream(self, agent: str, messages: List[dict]) -> LLMStream:
+        return LLMStream(self, agent, messages)
+
+    async def aclose(self):
+        for provider in self.providers.values():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                print(f"Error closing LLM provider {provider.name}: {e}")
+        if self.response_cache is not None:
+            self.response_cache.close()
+
+
+def build_llm_gateway() -> LLMGateway:
+    """Create the gateway for every provider that has an API key configured."""
+    providers = {}
+    if settings.GROQ_API_KEY:
+        providers["groq"] = OpenAICompatibleProvider(
+            "groq", settings.GROQ_API_KEY, settings.GROQ_BASE_URL, settings.GROQ_MODEL
+        )
+    if settings.SILICONFLOW_API_KEY:
+        providers["siliconflow"] = OpenAICompatibleProvider(
+            "siliconflow", settings.SILICONFLOW_API_KEY, settings.SILICONFLOW_BASE_URL, settings.SILICONFLOW_MODEL
+        )
+    if settings.GEMINI_API_KEY:
+        providers["gemini"] = GeminiProvider(
+            settings.GEMINI_API_KEY, settings.GEMINI_MODEL, settings.GEMINI_BASE_URL
+        )
+    if not providers:
+        print("Warning: no LLM provider API key is set!")
+
+    order = [n.strip() for n in settings.LLM_FAILOVER_ORDER.split(",") if n.strip()]
+    return LLMGateway(
+        providers,
+        failover_order=order,
+        response_cache=build_llm_cache(),
+        semantic_cache=build_semantic_cache(),
+    )
+
+
+clients.register("llm_gateway", build_llm_gateway, close=LLMGateway.aclose)
+
+
+def get_llm_gateway() -> LLMGateway:
+    return clients.get("llm_gateway")
@@ -1,9 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from backend.app.core.config import settings
+
+# min/max rounds pin the cost, so hashes made with a different BCRYPT_ROUNDS
+# are reported by needs_update() and rehashed on the next successful login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class HashingQueueFull(Exception):
+    """Raised when too many hash/verify calls are already waiting for a worker."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL while it hashes, so the event loop keeps serving
+    other requests (and open chat streams) during a login spike. At most
+    ``workers`` hashes run at once and at most ``max_queue`` more wait for a
+    worker; calls beyond that fail fast with HashingQueueFull.
+    """
+
+    def __init__(self, workers: int = settings.PASSWORD_HASH_WORKERS, max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def submit(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HashingQueueFull()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self._run, fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": max(0, self.pending - self.running),
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+def _prepare(password: str) -> bytes:
+    """bcrypt only uses the first 72 bytes; every path cuts the password the same way."""
+    return password.encode("utf-8")[:72]
 
 async def hash_password(password: str) -> str:
-    return pwd_context.hash(password[:72])
+    return await password_hasher.submit(pwd_context.hash, _prepare(password))
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return await password_hasher.submit(pwd_context.verify, _prepare(plain_password), hashed_password)
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password; also returns a new hash when the stored one uses an outdated cost."""
+    return await password_hasher.submit(pwd_context.verify_and_update, _prepare(plain_password), hashed_password)
@@ -0,0 +1,177 @@
+"""Semantic matching of job descriptions against student portfolios.
+
+Every portfolio is embedded once (see embeddings.py) into one row of a
+float32 matrix. A query is a single matrix-vector product followed by
+``argpartition``, so its cost is one pass over contiguous memory rather than
+a Python loop over portfolios.
+
+When PORTFOLIO_VECTOR_PATH is set the matrix is saved there as ``.npy`` (plus
+a ``.json`` sidecar with the row keys) and memory-mapped back on startup, so
+queries are served immediately while the background rebuild from the
+database runs.
+"""
+import asyncio
+import json
+import os
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.database.storage import get_all_portfolios
+from backend.app.services.embeddings import HashingEmbedder, embedder
+
+
+def portfolio_text(career_role: str | None, skills: str | None, summary: str | None) -> str:
+    return ". ".join(part for part in (career_role, skills, summary) if part)
+
+
+class VectorMatrix:
+    """Growable matrix of unit vectors with a key and a record per row."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+        self._rows: dict[str, int] = {}
+        self._keys: list[str] = []
+        self._records: list[dict] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def upsert(self, key: str, vector: np.ndarray, record: dict):
+        row = self._rows.get(key)
+        if row is None:
+            if self._count == len(self._matrix):
+                self._grow()
+            row = self._count
+            self._count += 1
+            self._rows[key] = row
+            self._keys.append(key)
+            self._records.append(record)
+        else:
+            self._records[row] = record
+        self._matrix[row] = vector
+
+    def _grow(self):
+        capacity = max(1024, 2 * len(self._matrix))
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[: self._count] = self._matrix[: self._count]
+        self._matrix = matrix
+
+    def top_k(self, vector: np.ndarray, k: int) -> list[tuple[float, dict]]:
+        n = self._count
+        k = min(k, n)
+        if k <= 0:
+            return []
+        scores = self._matrix[:n] @ vector
+        best = np.argpartition(scores, n - k)[n - k:]
+        best = best[np.argsort(scores[best])[::-1]]
+        return [(float(scores[i]), self._records[i]) for i in best]
+
+    def save(self, path: str):
+        # Write then rename, so a matrix still mapped from the old file is untouched.
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.npy.tmp", "wb") as f:
+            np.save(f, self._matrix[: self._count])
+        with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump({"keys": self._keys, "records": self._records}, f)
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str) -> "VectorMatrix":
+        # Copy-on-write mapping: pages are read lazily from disk and updates
+        # stay private to this process.
+        matrix = np.load(f"{path}.npy", mmap_mode="c")
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = cls(matrix.shape[1])
+        vectors._matrix = matrix
+        vectors._count = len(matrix)
+        vectors._keys = meta["keys"]
+        vectors._records = meta["records"]
+        vectors._rows = {key: row for row, key in enumerate(vectors._keys)}
+        return vectors
+
+
+class PortfolioMatcher:
+    def __init__(self, embedder: HashingEmbedder = embedder, path: str | None = settings.PORTFOLIO_VECTOR_PATH):
+        self.embedder = embedder
+        self.path = path
+        self.vectors = VectorMatrix(embedder.dim)
+        self._build_task: asyncio.Task | None = None
+        self._pending: list[tuple] | None = None
+        self.ready = False
+
+    def _load_persisted(self):
+        if not self.path or not os.path.exists(f"{self.path}.npy"):
+            return
+        try:
+            vectors = VectorMatrix.load(self.path)
+        except Exception as e:
+            print(f"Error loading portfolio vectors: {e}")
+            return
+        if vectors.dim == self.embedder.dim:
+            self.vectors = vectors
+            self.ready = True
+
+    async def rebuild(self):
+        self._pending = []
+        try:
+            portfolios = await get_all_portfolios()
+            texts = [
+                portfolio_text(p.get("career_role"), p.get("skills"), p.get("summary"))
+                for p in portfolios
+            ]
+            matrix = await asyncio.to_thread(self.embedder.embed_many, texts)
+
+            vectors = VectorMatrix(self.embedder.dim)
+            for row, portfolio in zip(matrix, portfolios):
+                user_id = str(portfolio.get("user_id"))
+                vectors.upsert(user_id, row, self._record(
+                    user_id, portfolio.get("career_role"), portfolio.get("skills"), portfolio.get("summary")
+                ))
+            for args in self._pending:
+                vectors.upsert(*args)
+
+            self.vectors = vectors
+            self.ready = True
+            if self.path:
+                await asyncio.to_thread(vectors.save, self.path)
+        finally:
+            self._pending = None
+
+    def start(self):
+        """Load persisted vectors and rebuild from the database in the background."""
+        if not self.ready:
+            self._load_persisted()
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self.rebuild())
+        return self._build_task
+
+    async def ensure_ready(self):
+        if not self.ready:
+            await asyncio.shield(self.start())
+
+    @staticmethod
+    def _record(user_id: str, career_role: str | None, skills: str | None, summary: str | None) -> dict:
+        return {"user_id": user_id, "career_role": career_role, "skills": skills, "summary": summary}
+
+    def upsert_portfolio(self, user_id: str, career_role: str, skills: str, summary: str):
+        vector = self.embedder.embed(portfolio_text(career_role, skills, summary))
+        args = (str(user_id), vector, self._record(str(user_id), career_role, skills, summary))
+        self.vectors.upsert(*args)
+        if self._pending is not None:
+            self._pending.append(args)
+
+    async def match(self, description: str, k: int = 10) -> list[dict]:
+        await self.ensure_ready()
+        query = self.embedder.embed(description)
+        return [
+            {**record, "similarity": round(score, 4)}
+            for score, record in self.vectors.top_k(query, k)
+        ]
+
+
+portfolio_matcher = PortfolioMatcher()
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+
+from backend.app.core.config import settings
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+    fresh_until: float
+    stale_until: float
+
+
+def serialize(payload) -> CachedBody:
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return CachedBody(body=body, etag=etag, fresh_until=0.0, stale_until=0.0)
+
+
+class ResponseCache:
+    """Cache of already-serialized JSON response bodies.
+
+    Entries are served as-is for ``ttl`` seconds. After that, and for another
+    ``stale_ttl`` seconds, the stale body is still served while one background
+    task rebuilds it (stale-while-revalidate). Older entries are rebuilt inline.
+
+    A build that raises is never stored. If an inline rebuild fails, the last
+    good body for the key is served; with none, the error reaches the caller.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.CATALOG_CACHE_TTL_SECONDS,
+        stale_ttl: float = settings.CATALOG_CACHE_STALE_SECONDS,
+        max_entries: int = settings.CATALOG_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedBody] = OrderedDict()
+        # One lock per key being built inline, dropped when nobody holds or
+        # waits for it (also when the build raised).
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # Bumped by invalidate() so a build that started before the
+        # invalidation cannot store its now-outdated result.
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_or_build(self, key: str, build: Callable[[], Awaitable[object]]) -> CachedBody:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry and now < entry.fresh_until:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        if entry and now < entry.stale_until:
+            self.stale_hits += 1
+            self._entries.move_to_end(key)
+            if key not in self._refreshing:
+                task = asyncio.create_task(self._build(key, build))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda t: self._refreshed(key, t))
+            return entry
+
+        self.misses += 1
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                # Another request may have rebuilt it while we waited for the lock.
+                entry = self._entries.get(key)
+                if entry and time.monotonic() < entry.fresh_until:
+                    return entry
+                try:
+                    return await self._build(key, build)
+                except Exception as e:
+                    self.errors += 1
+                    if entry is None:
+                        raise
+                    print(f"Catalog cache rebuild of {key} failed, serving the last good copy: {e!r}")
+                    return entry
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    def _refreshed(self, key: str, task: asyncio.Task):
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            print(f"Catalog cache refresh of {key} failed: {task.exception()!r}")
+
+    async def _build(self, key: str, build: Callable[[], Awaitable[object]]) -> CachedBody:
+        generation = self._generation
+        entry = serialize(await build())
+        now = time.monotonic()
+        entry.fresh_until = now + self.ttl
+        entry.stale_until = entry.fresh_until + self.stale_ttl
+
+        if generation == self._generation:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose key starts with ``prefix`` (all entries by default)."""
+        self._generation += 1
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+def cached_response(request: Request, entry: CachedBody) -> Response:
+    """Build the HTTP response for a cache entry, answering 304 when the client's copy is current."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def unavailable_response() -> JSONResponse:
+    """503 for a catalog page that could not be built and has no last good copy."""
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Catalog temporarily unavailable, please try again shortly"},
+        headers={"Retry-After": "5"},
+    )
+
+
+catalog_cache = ResponseCache()
+
+
+def invalidate_catalog(name: str = ""):
+    """Invalidation hook for code that writes to the lectures or candidates tables.
+
+    The API has no such write path yet (the tables are maintained outside
+    this service), so until one calls this, edits show up once entries expire.
+    """
+    catalog_cache.invalidate(name)
@@ -0,0 +1,167 @@
+"""Near-duplicate prompt cache.
+
+Cached prompts are embedded locally (see embeddings.py) into the rows of one
+preallocated float32 matrix. A lookup is a single matrix-vector product over
+the rows of the same namespace (agent, model, context hash); the best row is
+a hit when its cosine similarity reaches ``threshold``. The context hash
+covers the system prompt and any earlier turns (llm_cache.split_prompt), so
+a follow-up is only matched within its own conversation. At most
+``max_entries`` namespaces are kept; the least recently used one is dropped
+together with its rows.
+
+Before embedding, prompts are normalized (case, punctuation, common
+abbreviations such as "ML") and only articles and "please" are dropped.
+Question words and verbs stay, so "what is python" and "why python" embed
+differently and never share an answer.
+"""
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.candidate_search import SKILL_ALIASES
+from backend.app.services.embeddings import HashingEmbedder, embedder
+from backend.app.services.llm_cache import estimate_tokens, split_prompt
+
+# Words that never change what is being asked.
+NOISE_WORDS = frozenset(["a", "an", "the", "please", "pls"])
+
+
+def canonical_prompt(message: str) -> str:
+    text = unicodedata.normalize("NFKC", message).casefold()
+    text = "".join(ch if ch.isalnum() or ch in "+#." or unicodedata.category(ch)[0] == "M" else " " for ch in text)
+    words = []
+    for word in text.split():
+        word = SKILL_ALIASES.get(word.strip("."), word.strip("."))
+        if word and word not in NOISE_WORDS:
+            words.append(word)
+    return " ".join(words)
+
+
+class SemanticCache:
+    """Fixed-capacity semantic cache with TTL and least-recently-used eviction."""
+
+    def __init__(
+        self,
+        agents: Optional[set] = None,
+        threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl: float = settings.SEMANTIC_CACHE_TTL_SECONDS,
+        embedder: HashingEmbedder = embedder,
+    ):
+        self.agents = set(agents or ())
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self._matrix = np.zeros((max_entries, embedder.dim), dtype=np.float32)
+        # Per-row state; a namespace id of -1 marks a free slot.
+        self._namespace = np.full(max_entries, -1, dtype=np.int32)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._values: List[Optional[dict]] = [None] * max_entries
+        self._namespaces: OrderedDict[tuple, int] = OrderedDict()
+        self._next_namespace = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+
+    def enabled_for(self, agent: str) -> bool:
+        return agent in self.agents
+
+    def _namespace_id(self, key: tuple, create: bool) -> Optional[int]:
+        namespace = self._namespaces.get(key)
+        if namespace is not None:
+            self._namespaces.move_to_end(key)
+            return namespace
+        if not create:
+            return None
+        if len(self._namespaces) >= self.max_entries:
+            _, dropped = self._namespaces.popitem(last=False)
+            self._namespace[self._namespace == dropped] = -1
+        namespace = self._namespaces[key] = self._next_namespace
+        self._next_namespace += 1
+        return namespace
+
+    def _prepare(self, agent: str, model: str, messages: List[dict], create: bool = False):
+        prompt = split_prompt(messages)
+        if prompt is None:
+            return None
+        context_hash, user = prompt
+        text = canonical_prompt(user)
+        if not text:
+            return None
+        # Lookups never add a namespace, so only stored answers use one up.
+        return self._namespace_id((agent, model, context_hash), create), text
+
+    def get(self, agent: str, model: str, messages: List[dict]) -> Optional[dict]:
+        prepared = self._prepare(agent, model, messages)
+        if prepared is None:
+            return None
+        namespace, text = prepared
+        if namespace is None:
+            self.misses += 1
+            return None
+        vector = self.embedder.embed(text)
+
+        now = time.time()
+        scores = self._matrix @ vector
+        live = (self._namespace == namespace) & (self._expires_at > now)
+        scores[~live] = -np.inf
+        row = int(np.argmax(scores))
+        if scores[row] < self.threshold:
+            self.misses += 1
+            return None
+
+        self._last_used[row] = now
+        value = self._values[row]
+        self.hits += 1
+        self.tokens_saved += value.get("tokens", 0)
+        return value
+
+    def put(self, agent: str, model: str, messages: List[dict], text: str, provider: str):
+        prepared = self._prepare(agent, model, messages, create=True)
+        if prepared is None:
+            return
+        namespace, prompt = prepared
+        vector = self.embedder.embed(prompt)
+
+        now = time.time()
+        free = np.flatnonzero((self._namespace < 0) | (self._expires_at <= now))
+        if len(free):
+            row = int(free[0])
+        else:
+            row = int(np.argmin(self._last_used))
+            self.evictions += 1
+
+        self._matrix[row] = vector
+        self._namespace[row] = namespace
+        self._expires_at[row] = now + self.ttl
+        self._last_used[row] = now
+        tokens = sum(estimate_tokens(m["content"]) for m in messages) + estimate_tokens(text)
+        self._values[row] = {"text": text, "provider": provider, "model": model, "tokens": tokens}
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero((self._namespace >= 0) & (self._expires_at > time.time())))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+def build_semantic_cache() -> Optional[SemanticCache]:
+    agents = {a.strip() for a in settings.SEMANTIC_CACHE_AGENTS.split(",") if a.strip()}
+    if not agents or settings.SEMANTIC_CACHE_MAX_ENTRIES <= 0:
+        return None
+    return SemanticCache(agents)
@@ -0,0 +1,62 @@
+from cachetools import TTLCache
+
+from backend.app.core.config import settings
+
+
+def token_id(payload: dict):
+    """Identify the token a user was authenticated with (jti, or iat for older tokens)."""
+    return payload.get("jti") or payload.get("iat") or payload.get("exp")
+
+
+class UserCache:
+    """Bounded LRU/TTL cache of authenticated users keyed by (user id, token id).
+
+    Entries expire after ``ttl`` seconds so changes made by other workers are
+    picked up; changes made in this process call ``invalidate_user``. A user
+    id -> keys index keeps invalidation proportional to that user's tokens.
+    """
+
+    def __init__(self, maxsize: int = settings.AUTH_USER_CACHE_SIZE, ttl: float = settings.AUTH_USER_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._keys: dict[int, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, token):
+        user = self._cache.get((user_id, token))
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def put(self, user_id: int, token, user):
+        self._cache[(user_id, token)] = user
+        # Drop keys the cache expired or evicted on its own.
+        keys = {k for k in self._keys.get(user_id, ()) if k in self._cache}
+        keys.add((user_id, token))
+        self._keys[user_id] = keys
+        if len(self._keys) > 2 * self._cache.maxsize:
+            self._rebuild_index()
+
+    def invalidate_user(self, user_id: int):
+        for key in self._keys.pop(user_id, ()):
+            self._cache.pop(key, None)
+        self.invalidations += 1
+
+    def _rebuild_index(self):
+        self._keys = {}
+        for key in list(self._cache.keys()):
+            self._keys.setdefault(key[0], set()).add(key)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache()
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from cachetools import TTLCache
+
+from backend.app.core.clients import clients
+from backend.app.core.config import settings
+from backend.app.core.singleflight import SingleFlight
+from backend.app.services.embeddings import STOP_WORDS
+
+# Split on anything that is not a word character or a combining mark (Myanmar
+# and other Brahmic scripts put vowel signs in Mn/Mc, which \w does not match).
+_KEEP = "+#'"
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a search query, used both as the cache key and as the
+    query sent to YouTube: NFKC, lowercase, punctuation and stop words removed,
+    repeated words dropped.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = "".join(
+        ch if ch in _KEEP or ch.isalnum() or unicodedata.category(ch)[0] == "M" else " "
+        for ch in text
+    )
+    words = [w.strip("'") for w in text.split() if w.strip("'")]
+    kept = [w for w in words if w not in STOP_WORDS] or words
+    return " ".join(dict.fromkeys(kept))
+
+
+def build_youtube_client():
+    # Imported here so the HTTP stack is only set up once a search happens.
+    import httpx
+
+    return httpx.AsyncClient(
+        base_url=settings.YOUTUBE_API_BASE_URL,
+        timeout=settings.YOUTUBE_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=5),
+    )
+
+
+clients.register("youtube", build_youtube_client, close=lambda client: client.aclose())
+
+
+class DiskCache:
+    """SQLite-backed second cache layer so results survive restarts."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS youtube_cache "
+                "(query TEXT PRIMARY KEY, videos TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM youtube_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def get(self, query: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT videos, expires_at FROM youtube_cache WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, query: str, videos: list, ttl: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO youtube_cache (query, videos, expires_at) VALUES (?, ?, ?)",
+                (query, json.dumps(videos, ensure_ascii=False), time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class YouTubeSearch:
+    """Video lookups through one pooled client.
+
+    Results are cached per normalized query in a TTL+LRU memory cache and,
+    when ``disk_path`` is set, in SQLite. Concurrent lookups for the same
+    query share a single API call. Failed lookups return ``[]`` and are not
+    cached; without an API key every lookup returns ``[]`` without a request.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = settings.YOUTUBE_API_KEY,
+        ttl: float = settings.YOUTUBE_CACHE_TTL_SECONDS,
+        max_entries: int = settings.YOUTUBE_CACHE_MAX_ENTRIES,
+        disk_path: str | None = settings.YOUTUBE_CACHE_PATH,
+    ):
+        self.api_key = api_key
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._disk_path = disk_path
+        self._disk: DiskCache | None = None
+        self._flight = SingleFlight("youtube")
+        self._warned_no_key = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _disk_cache(self) -> DiskCache | None:
+        if self._disk is None and self._disk_path:
+            try:
+                self._disk = DiskCache(self._disk_path)
+            except Exception as e:
+                print(f"YouTube disk cache disabled: {e}")
+                self._disk_path = None
+        return self._disk
+
+    async def search(self, query: str, max_results: int = 3) -> list:
+        key = normalize_query(query)
+        if not key:
+            return []
+
+        videos = self._memory.get(key)
+        if videos is not None:
+            self.hits += 1
+            return videos[:max_results]
+
+        if not self.api_key:
+            if not self._warned_no_key:
+                self._warned_no_key = True
+                print("YouTube search disabled: YOUTUBE_API_KEY is not set")
+            return []
+
+        try:
+            videos = await self._flight.do(key, lambda: self._lookup(key))
+        except Exception as e:
+            self.errors += 1
+            print(f"YouTube search error: {e}")
+            return []
+        return videos[:max_results]
+
+    async def _lookup(self, key: str) -> list:
+        disk = self._disk_cache()
+        if disk is not None:
+            videos = await asyncio.to_thread(disk.get, key)
+            if videos is not None:
+                self.disk_hits += 1
+                self._memory[key] = videos
+                return videos
+
+        self.misses += 1
+        response = await clients.get("youtube").get(
+            "/search",
+            params={
+                "q": key,
+                "part": "snippet",
+                "type": "video",
+                "maxResults": 3,
+                "key": self.api_key,
+            },
+        )
+        response.raise_for_status()
+        videos = [
+            {"title": v["snippet"]["title"], "link": f"https://youtu.be/{v['id']['videoId']}"}
+            for v in response.json().get("items", [])
+        ]
+        self._memory[key] = videos
+        if disk is not None:
+            await asyncio.to_thread(disk.put, key, videos, self.ttl)
+        return videos
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "collapsed": self._flight.shared,
+            "errors": self.errors,
+        }
+
+
+youtube_search = YouTubeSearch()
+
+
+async def get_youtube_videos(query: str) -> list:
+    return await youtube_search.search(query)
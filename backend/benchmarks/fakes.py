@@ -0,0 +1,174 @@
+"""Local stand-ins for the external services the backend calls.
+
+Serve with:
+
+    python -m uvicorn backend.benchmarks.fakes:app --port 9100
+
+and point the backend at it:
+
+    GROQ_BASE_URL=http://127.0.0.1:9100/openai/v1
+    SILICONFLOW_BASE_URL=http://127.0.0.1:9100/openai/v1
+    GEMINI_BASE_URL=http://127.0.0.1:9100/gemini
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:9100/youtube/v3
+
+Answers are deterministic. Latency is shaped by environment variables:
+FAKE_TTFT_MS (delay before the first token), FAKE_TOKEN_MS (delay between
+tokens), FAKE_TOKENS (tokens per answer) and FAKE_YOUTUBE_MS. Portfolio
+analysis prompts get a JSON answer, like the real models are asked for.
+
+Tests can break one model at a time through ``FAULTS`` (model name ->
+"error" for an HTTP 500, "stall" to hold back the first token, "drop" to cut
+the connection after the first token); ``CALLS`` records the model of every
+LLM request in arrival order.
+"""
+import asyncio
+import json
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+TTFT = float(os.getenv("FAKE_TTFT_MS", 250)) / 1000
+TOKEN_DELAY = float(os.getenv("FAKE_TOKEN_MS", 15)) / 1000
+TOKENS = int(os.getenv("FAKE_TOKENS", 80))
+YOUTUBE_DELAY = float(os.getenv("FAKE_YOUTUBE_MS", 120)) / 1000
+STALL = 30.0
+
+FAULTS: dict[str, str] = {}
+CALLS: list[str] = []
+
+PORTFOLIO_ANSWER = json.dumps({
+    "career_role": "Data Scientist",
+    "skills": "Python, SQL, Machine Learning, Statistics, Communication",
+    "summary": "Analytical learner. Built several data projects. Aiming for a data science role.",
+})
+
+
+def _answer_tokens(prompt: str) -> list[str]:
+    if "career analyst" in prompt:
+        return [PORTFOLIO_ANSWER]
+    words = ["Step", "1:", "learn", "the", "fundamentals,", "then", "build", "a", "project", "and", "launch."]
+    return [words[i % len(words)] + " " for i in range(TOKENS)]
+
+
+async def _tokens(prompt: str, model: str):
+    fault = FAULTS.get(model)
+    await asyncio.sleep(STALL if fault == "stall" else TTFT)
+    for i, token in enumerate(_answer_tokens(prompt)):
+        if i:
+            if fault == "drop":
+                raise ConnectionResetError(f"fake {model} dropped the stream")
+            await asyncio.sleep(TOKEN_DELAY)
+        yield token
+
+
+def _failed(model: str) -> JSONResponse | None:
+    CALLS.append(model)
+    if FAULTS.get(model) == "error":
+        return JSONResponse({"error": {"message": f"fake {model} is down", "code": 500}}, status_code=500)
+    return None
+
+
+# ========================
+# OpenAI-compatible (Groq, SiliconFlow)
+# ========================
+
+async def openai_chat_completions(request: Request):
+    body = await request.json()
+    prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    model = body.get("model", "fake")
+    created = int(time.time())
+    if (failed := _failed(model)) is not None:
+        return failed
+
+    if not body.get("stream"):
+        text = "".join([t async for t in _tokens(prompt, model)])
+        return JSONResponse({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": TOKENS, "total_tokens": len(prompt) // 4 + TOKENS},
+        })
+
+    async def events():
+        async for token in _tokens(prompt, model):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        done = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ========================
+# Gemini (generateContent / streamGenerateContent)
+# ========================
+
+def _gemini_chunk(text: str, final: bool = False) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if final:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate], "modelVersion": "fake"}
+
+
+async def gemini_models(request: Request):
+    body = await request.json()
+    parts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])]
+    system = body.get("systemInstruction") or body.get("system_instruction") or {}
+    parts += [p.get("text", "") for p in system.get("parts", [])]
+    prompt = " ".join(parts)
+    action = request.path_params["action"]
+    model = action.split(":")[0]
+    if (failed := _failed(model)) is not None:
+        return failed
+
+    if action.endswith(":generateContent"):
+        text = "".join([t async for t in _tokens(prompt, model)])
+        return JSONResponse(_gemini_chunk(text, final=True))
+
+    async def events():
+        async for token in _tokens(prompt, model):
+            yield f"data: {json.dumps(_gemini_chunk(token))}\r\n\r\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ========================
+# YouTube Data API search
+# ========================
+
+async def youtube_search(request: Request):
+    await asyncio.sleep(YOUTUBE_DELAY)
+    query = request.query_params.get("q", "")
+    count = int(request.query_params.get("maxResults", 3))
+    return JSONResponse({
+        "items": [
+            {"id": {"videoId": f"fake{i}"}, "snippet": {"title": f"{query} tutorial {i + 1}"}}
+            for i in range(count)
+        ]
+    })
+
+
+app = Starlette(routes=[
+    Route("/openai/v1/chat/completions", openai_chat_completions, methods=["POST"]),
+    Route("/gemini/{version}/models/{action:path}", gemini_models, methods=["POST"]),
+    Route("/youtube/v3/search", youtube_search, methods=["GET"]),
+])
@@ -0,0 +1,322 @@
+"""Offline load test of the whole backend.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.load_test --concurrency 50 --duration 30
+
+What it does:
+
+1. creates a SQLite database (the Supabase stand-in) with the users,
+   chat_history, student_portfolios, lectures and candidates tables and
+   seeds it with a fixed --seed;
+2. starts backend/benchmarks/fakes.py (OpenAI-compatible, Gemini and
+   YouTube stand-ins) and ``backend.app.app:app`` as two uvicorn
+   processes, with the app's provider URLs and database pointed at them;
+3. drives a weighted mix of streaming chat (SSE), lecture pages, logins and
+   portfolio analyses from --concurrency clients for --duration seconds;
+4. reports throughput, p50/p99 latency and, for streams, time to first
+   token per scenario.
+
+Nothing leaves the machine, so results are comparable run to run. Use
+--base-url to drive an already running server instead (steps 1-2 skipped).
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+SCENARIOS = ("stream", "lectures", "login", "portfolio")
+COURSES = ["python", "web", "data", "design", "business"]
+SKILLS = ["Python", "SQL", "React", "Machine Learning", "Docker", "Figma", "Node.js", "Statistics"]
+TOPICS = [
+    "become a data scientist", "start a coffee shop business", "learn react for frontend jobs",
+    "prepare for a backend developer interview", "launch a mobile app startup",
+    "become a machine learning engineer", "switch careers into UX design",
+    "build an online tutoring business", "get a cloud engineering job", "learn SQL for analytics",
+]
+STREAM_AGENTS = ["cofounder", "mentor", "support", "roadmap"]
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "Benchmark1"
+
+
+# ========================
+# Environment
+# ========================
+
+def seed_database(path: str, seed: int, users: int):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL UNIQUE, email TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, is_updated TIMESTAMP,
+            is_active BOOLEAN);
+        CREATE TABLE chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, role TEXT, message TEXT,
+            agent_type TEXT, created_at TIMESTAMP);
+        CREATE INDEX ix_chat_history_user_id_created_at ON chat_history (user_id, created_at);
+        CREATE TABLE student_portfolios (
+            user_id TEXT PRIMARY KEY, career_role TEXT, skills TEXT, summary TEXT,
+            analyzed_until TIMESTAMP);
+        CREATE TABLE lectures (
+            id INTEGER PRIMARY KEY, title TEXT, youtube_id TEXT, duration TEXT, course TEXT);
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY, name TEXT, role TEXT, skills TEXT, match_score REAL,
+            experience TEXT, summary TEXT, location TEXT);
+    """)
+    conn.executemany(
+        "INSERT INTO lectures (id, title, youtube_id, duration, course) VALUES (?, ?, ?, ?, ?)",
+        [(i, f"Lecture {i}", f"vid{i:05d}", f"{rng.randint(5, 60)}:00", rng.choice(COURSES)) for i in range(1, 2001)],
+    )
+    conn.executemany(
+        "INSERT INTO candidates (id, name, role, skills, match_score, experience, summary, location) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (i, f"Candidate {i}", rng.choice(["Data Scientist", "Frontend Developer", "Designer"]),
+             ", ".join(rng.sample(SKILLS, 3)), round(rng.uniform(50, 100), 1),
+             f"{rng.randint(0, 10)} years", "Seeded candidate", rng.choice(["Yangon", "Mandalay", "Remote"]))
+            for i in range(1, 5001)
+        ],
+    )
+    rows = []
+    for u in range(users):
+        for j in range(10):
+            rows.append((f"student-{u}", "user", rng.choice(TOPICS), "mentor", f"2026-01-01 00:{j:02d}:00+00:00"))
+    conn.executemany(
+        "INSERT INTO chat_history (user_id, role, message, agent_type, created_at) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def start_servers(args, workdir: str) -> list[subprocess.Popen]:
+    db_path = os.path.join(workdir, "bench.sqlite3")
+    seed_database(db_path, args.seed, args.users)
+    fake = f"http://127.0.0.1:{args.fake_port}"
+
+    fake_env = {
+        **os.environ,
+        "FAKE_TTFT_MS": str(args.fake_ttft_ms),
+        "FAKE_TOKEN_MS": str(args.fake_token_ms),
+        "FAKE_TOKENS": str(args.fake_tokens),
+    }
+    app_env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "SQLALCHEMY_DATABASE_URI": f"sqlite+aiosqlite:///{db_path}",
+        "GROQ_API_KEY": "fake", "SILICONFLOW_API_KEY": "fake", "GEMINI_API_KEY": "fake", "YOUTUBE_API_KEY": "fake",
+        "GROQ_BASE_URL": f"{fake}/openai/v1",
+        "SILICONFLOW_BASE_URL": f"{fake}/openai/v1",
+        "GEMINI_BASE_URL": f"{fake}/gemini",
+        "YOUTUBE_API_BASE_URL": f"{fake}/youtube/v3",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        # Every simulated user shares one client address, so the per-user
+        # token bucket is off unless asked for.
+        "RATE_LIMIT_PER_MINUTE": str(args.rate_limit_per_minute),
+    }
+    uvicorn = [sys.executable, "-m", "uvicorn", "--log-level", "warning", "--no-access-log"]
+    return [
+        subprocess.Popen([*uvicorn, "backend.benchmarks.fakes:app", "--port", str(args.fake_port)], env=fake_env),
+        subprocess.Popen(
+            [*uvicorn, "backend.app.app:app", "--port", str(args.app_port), "--workers", str(args.workers)],
+            env=app_env,
+        ),
+    ]
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("backend did not become ready")
+
+
+# ========================
+# Scenarios
+# ========================
+
+@dataclass
+class Samples:
+    latencies: list = field(default_factory=list)
+    ttfts: list = field(default_factory=list)
+    errors: int = 0
+
+
+async def run_stream(client, rng, args, samples: Samples):
+    agent = rng.choice(STREAM_AGENTS)
+    body = {"user_id": f"student-{rng.randrange(args.users)}", "message": rng.choice(TOPICS[: args.distinct_prompts])}
+    start = time.perf_counter()
+    ttft = None
+    async with client.stream("POST", f"/chat/stream/{agent}", json=body) as response:
+        if response.status_code != 200:
+            samples.errors += 1
+            return
+        failed = False
+        async for line in response.aiter_lines():
+            if ttft is None and line == "event: token":
+                ttft = time.perf_counter() - start
+            elif line == "event: error":
+                failed = True
+    if failed or ttft is None:
+        samples.errors += 1
+        return
+    samples.latencies.append(time.perf_counter() - start)
+    samples.ttfts.append(ttft)
+
+
+async def run_lectures(client, rng, args, samples: Samples):
+    params = {"limit": 50}
+    if rng.random() < 0.5:
+        params["course"] = rng.choice(COURSES)
+    start = time.perf_counter()
+    response = await client.get("/api/lectures", params=params)
+    if response.status_code != 200:
+        samples.errors += 1
+        return
+    samples.latencies.append(time.perf_counter() - start)
+
+
+async def run_login(client, rng, args, samples: Samples):
+    start = time.perf_counter()
+    response = await client.post("/authentication/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    if response.status_code != 200:
+        samples.errors += 1
+        return
+    samples.latencies.append(time.perf_counter() - start)
+
+
+async def run_portfolio(client, rng, args, samples: Samples):
+    body = {"user_id": f"student-{rng.randrange(args.users)}", "message": "analyze"}
+    start = time.perf_counter()
+    response = await client.post("/chat/portfolio-analysis", json=body)
+    if response.status_code != 200 or "error" in response.json():
+        samples.errors += 1
+        return
+    samples.latencies.append(time.perf_counter() - start)
+
+
+RUNNERS = {"stream": run_stream, "lectures": run_lectures, "login": run_login, "portfolio": run_portfolio}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in RUNNERS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def client_loop(client, worker: int, args, mix: dict, results: dict, deadline: float):
+    rng = random.Random(args.seed * 1000 + worker)
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        try:
+            await RUNNERS[name](client, rng, args, results[name])
+        except httpx.HTTPError:
+            results[name].errors += 1
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(q * len(values)) - 1))]
+
+
+def report(results: dict, elapsed: float):
+    print(f"{'scenario':<11}{'ok':>7}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'ttft p50':>10}{'ttft p99':>10}")
+    total = 0
+    for name, s in results.items():
+        total += len(s.latencies)
+        ttft50 = f"{percentile(s.ttfts, 0.5) * 1000:>10.1f}" if s.ttfts else f"{'-':>10}"
+        ttft99 = f"{percentile(s.ttfts, 0.99) * 1000:>10.1f}" if s.ttfts else f"{'-':>10}"
+        print(
+            f"{name:<11}{len(s.latencies):>7}{s.errors:>6}{len(s.latencies) / elapsed:>9.1f}"
+            f"{percentile(s.latencies, 0.5) * 1000:>9.1f}{percentile(s.latencies, 0.99) * 1000:>9.1f}{ttft50}{ttft99}"
+        )
+    print(f"{'total':<11}{total:>7}{'':>6}{total / elapsed:>9.1f}")
+
+
+async def drive(base_url: str, args):
+    mix = parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await wait_ready(client)
+        await client.post(
+            "/authentication/register",
+            json={"username": "bench", "email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+        )
+        # Every route outside /authentication needs a token.
+        login = await client.post("/authentication/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        if args.warmup > 0:
+            warm = {name: Samples() for name in mix}
+            deadline = time.monotonic() + args.warmup
+            await asyncio.gather(*[client_loop(client, w, args, mix, warm, deadline) for w in range(args.concurrency)])
+
+        results = {name: Samples() for name in mix}
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*[client_loop(client, w, args, mix, results, deadline) for w in range(args.concurrency)])
+        elapsed = time.monotonic() - start
+
+    print(f"concurrency={args.concurrency} duration={args.duration}s mix={args.mix} seed={args.seed}")
+    report(results, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--mix", default="stream=5,lectures=3,login=1,portfolio=1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, default=200, help="distinct student ids")
+    parser.add_argument("--distinct-prompts", type=int, default=len(TOPICS))
+    parser.add_argument("--base-url", help="drive an already running server")
+    parser.add_argument("--app-port", type=int, default=9000)
+    parser.add_argument("--fake-port", type=int, default=9100)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--rate-limit-per-minute", type=float, default=0, help="0 disables the per-user limit")
+    parser.add_argument("--fake-ttft-ms", type=float, default=250)
+    parser.add_argument("--fake-token-ms", type=float, default=15)
+    parser.add_argument("--fake-tokens", type=int, default=80)
+    args = parser.parse_args()
+
+    if args.base_url:
+        asyncio.run(drive(args.base_url, args))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processes = start_servers(args, workdir)
+        try:
+            asyncio.run(drive(f"http://127.0.0.1:{args.app_port}", args))
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""add portfolio analysis watermark
+
+Revision ID: 3f9a1c2b7d4e
+Revises: 
+Create Date: 2026-10-17 10:00:00.000000
+
+This is the baseline revision. It assumes the tables that Supabase manages
+(student_portfolios, chat_history) already exist and only adds to them.
+Every statement is guarded with IF [NOT] EXISTS, so existing deployments
+can run ``alembic upgrade head`` directly. There is no need to
+``alembic stamp`` first, and re-running it on a database that already has
+the column or index changes nothing.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d4e'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # student_portfolios and chat_history are created in Supabase, not by the
+    # ORM models, so guard against a column/index that already exists.
+    op.execute(
+        "ALTER TABLE student_portfolios "
+        "ADD COLUMN IF NOT EXISTS analyzed_until TIMESTAMP WITH TIME ZONE"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_chat_history_user_id_created_at "
+        "ON chat_history (user_id, created_at)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_chat_history_user_id_created_at")
+    op.execute("ALTER TABLE student_portfolios DROP COLUMN IF EXISTS analyzed_until")
@@ -0,0 +1,38 @@
+"""unique student portfolio per user
+
+Revision ID: 5c7d9e1f2a4b
+Revises: 8b2e4d6f1a3c
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7d9e1f2a4b'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d6f1a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # save_portfolio upserts ON CONFLICT (user_id), which needs a unique index.
+    # Rows duplicated by the earlier update-then-insert are collapsed first,
+    # keeping the most recently written one.
+    op.execute(
+        "DELETE FROM student_portfolios a USING student_portfolios b "
+        "WHERE a.user_id = b.user_id AND a.ctid < b.ctid"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_student_portfolios_user_id "
+        "ON student_portfolios (user_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ux_student_portfolios_user_id")
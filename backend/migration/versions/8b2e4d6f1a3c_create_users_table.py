@@ -0,0 +1,39 @@
+"""create users table
+
+Revision ID: 8b2e4d6f1a3c
+Revises: 3f9a1c2b7d4e
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a3c'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases set up before this migration got the table from
+    # Base.metadata.create_all at app startup, so only create it if missing.
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS users ("
+        "id SERIAL PRIMARY KEY, "
+        "username VARCHAR NOT NULL UNIQUE, "
+        "email VARCHAR NOT NULL UNIQUE, "
+        "password VARCHAR NOT NULL, "
+        "created_at TIMESTAMP WITH TIME ZONE DEFAULT now(), "
+        "is_updated TIMESTAMP WITH TIME ZONE, "
+        "is_active BOOLEAN)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS users")
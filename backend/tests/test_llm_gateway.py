@@ -0,0 +1,156 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from backend.app.services.llm_gateway import (
+    GeminiProvider,
+    LLMGateway,
+    LLMUnavailableError,
+    OpenAICompatibleProvider,
+)
+from backend.benchmarks import fakes
+
+ORDER = ["groq", "siliconflow", "gemini"]
+MESSAGES = [{"role": "system", "content": "You are a mentor."}, {"role": "user", "content": "how do I learn python"}]
+
+
+@pytest.fixture(scope="module")
+def fake_url():
+    """The fake provider server from backend/benchmarks/fakes.py on a free local port."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(fakes.app, ws="none", log_level="critical", timeout_graceful_shutdown=1))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture(autouse=True)
+def fast_fakes(monkeypatch):
+    monkeypatch.setattr(fakes, "TTFT", 0.01)
+    monkeypatch.setattr(fakes, "TOKEN_DELAY", 0.005)
+    monkeypatch.setattr(fakes, "TOKENS", 5)
+    monkeypatch.setattr(fakes, "STALL", 3.0)
+    monkeypatch.setattr(fakes, "FAULTS", {})
+    monkeypatch.setattr(fakes, "CALLS", [])
+
+
+def run(fake_url: str, test, **kwargs):
+    """Run ``test(gateway)`` against groq, siliconflow and gemini served by the fake."""
+    async def main():
+        providers = {
+            "groq": OpenAICompatibleProvider("groq", "test", f"{fake_url}/openai/v1", "fake-groq"),
+            "siliconflow": OpenAICompatibleProvider("siliconflow", "test", f"{fake_url}/openai/v1", "fake-siliconflow"),
+            "gemini": GeminiProvider("test", "fake-gemini", f"{fake_url}/gemini"),
+        }
+        gateway = LLMGateway(providers, failover_order=ORDER, **kwargs)
+        try:
+            return await test(gateway)
+        finally:
+            await gateway.aclose()
+
+    return asyncio.run(main())
+
+
+async def collect(stream) -> str:
+    return "".join([text async for text in stream])
+
+
+@pytest.mark.parametrize("down, served", [
+    ([], "groq"),
+    (["fake-groq"], "siliconflow"),
+    (["fake-groq", "fake-siliconflow"], "gemini"),
+])
+def test_complete_fails_over_in_order(fake_url, down, served):
+    fakes.FAULTS.update({model: "error" for model in down})
+
+    result = run(fake_url, lambda gateway: gateway.complete("mentor", MESSAGES))
+
+    assert result.provider == served
+    assert result.text.startswith("Step 1:")
+    assert fakes.CALLS == [*down, f"fake-{served}"]
+
+
+def test_stream_fails_over_in_order(fake_url):
+    fakes.FAULTS.update({"fake-groq": "error", "fake-siliconflow": "error"})
+
+    async def test(gateway):
+        stream = gateway.stream("mentor", MESSAGES)
+        return stream, await collect(stream)
+
+    stream, text = run(fake_url, test)
+
+    assert stream.provider == "gemini"
+    assert text.startswith("Step 1:")
+    assert fakes.CALLS == ["fake-groq", "fake-siliconflow", "fake-gemini"]
+
+
+def test_all_providers_down(fake_url):
+    fakes.FAULTS.update({"fake-groq": "error", "fake-siliconflow": "error", "fake-gemini": "error"})
+
+    with pytest.raises(LLMUnavailableError):
+        run(fake_url, lambda gateway: gateway.complete("mentor", MESSAGES))
+
+
+def test_first_token_deadline_moves_to_next_provider(fake_url):
+    fakes.FAULTS["fake-groq"] = "stall"
+
+    async def test(gateway):
+        stream = gateway.stream("mentor", MESSAGES)
+        start = time.perf_counter()
+        text = await collect(stream)
+        return stream, text, time.perf_counter() - start
+
+    stream, text, elapsed = run(fake_url, test, first_token_timeout=0.3)
+
+    assert stream.provider == "siliconflow"
+    assert text.startswith("Step 1:")
+    assert 0.3 <= elapsed < fakes.STALL
+
+
+def test_no_failover_after_first_token(fake_url):
+    fakes.FAULTS["fake-groq"] = "drop"
+    received = []
+
+    async def test(gateway):
+        with pytest.raises(LLMUnavailableError, match="mid-stream"):
+            async for text in gateway.stream("mentor", MESSAGES):
+                received.append(text)
+
+    run(fake_url, test)
+
+    assert received == ["Step "]
+    assert fakes.CALLS == ["fake-groq"]
+
+
+def test_breaker_opens_and_resets(fake_url):
+    fakes.FAULTS["fake-groq"] = "error"
+
+    async def test(gateway):
+        names = lambda: [p.name for p in gateway.chain("mentor")]
+        for _ in range(2):
+            assert (await gateway.complete("mentor", MESSAGES)).provider == "siliconflow"
+        assert names() == ["siliconflow", "gemini"]
+
+        # While open, groq is not even tried.
+        fakes.CALLS.clear()
+        await gateway.complete("mentor", MESSAGES + [{"role": "user", "content": "again"}])
+        assert fakes.CALLS == ["fake-siliconflow"]
+
+        # After the cooldown groq is tried again, and one success closes the breaker.
+        del fakes.FAULTS["fake-groq"]
+        await asyncio.sleep(0.3)
+        assert names() == ORDER
+        result = await gateway.complete("mentor", MESSAGES + [{"role": "user", "content": "once more"}])
+        assert result.provider == "groq"
+        assert gateway._health["groq"].consecutive_failures == 0
+
+    run(fake_url, test, failure_threshold=2, cooldown=0.3)
@@ -0,0 +1,75 @@
+import pytest
+
+from backend.app.services.llm_cache import cache_key
+from backend.app.services.semantic_cache import SemanticCache, canonical_prompt
+
+SYSTEM = {"role": "system", "content": "You are a roadmap generator."}
+
+
+def prompt(text: str) -> list[dict]:
+    return [SYSTEM, {"role": "user", "content": text}]
+
+
+def cache_with(text: str, **kwargs) -> SemanticCache:
+    cache = SemanticCache({"roadmap"}, **kwargs)
+    cache.put("roadmap", "model", prompt(text), f"answer to {text}", "groq")
+    return cache
+
+
+def test_canonical_prompt_keeps_question_words():
+    assert canonical_prompt("What is Python?") == "what is python"
+    assert canonical_prompt("why python") == "why python"
+    assert canonical_prompt("Roadmap to become an ML engineer") == "roadmap to become machine learning engineer"
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("what is python", "why python"),
+    ("what is python", "why is python"),
+    ("roadmap to become a data scientist", "become a data scientist"),
+    ("learn react for frontend jobs", "learn vue for frontend jobs"),
+    ("how do I start a coffee shop", "how do I close a coffee shop"),
+])
+def test_near_miss_prompts_do_not_share_answers(stored, asked):
+    assert cache_with(stored).get("roadmap", "model", prompt(asked)) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("What is Python?", "what is python"),
+    ("Roadmap to become an ML engineer", "roadmap to become a machine learning engineer, please"),
+])
+def test_same_question_hits(stored, asked):
+    hit = cache_with(stored).get("roadmap", "model", prompt(asked))
+    assert hit is not None and hit["text"] == f"answer to {stored}"
+
+
+def test_namespaces_are_capped_and_dropped_with_their_rows():
+    cache = SemanticCache({"roadmap"}, max_entries=4)
+    for i in range(10):
+        system = {"role": "system", "content": f"prompt {i}"}
+        cache.put("roadmap", "model", [system, {"role": "user", "content": "what is python"}], "answer", "groq")
+    assert len(cache._namespaces) == 4
+    assert len(cache) == 4
+
+    # A lookup in an unseen namespace is a miss and does not add one.
+    assert cache.get("roadmap", "other-model", prompt("what is python")) is None
+    assert len(cache._namespaces) == 4
+
+
+def test_follow_ups_only_hit_within_their_conversation():
+    def conversation(topic: str, follow_up: str) -> list[dict]:
+        return [
+            SYSTEM,
+            {"role": "user", "content": f"roadmap for {topic}"},
+            {"role": "assistant", "content": f"{topic} roadmap"},
+            {"role": "user", "content": follow_up},
+        ]
+
+    cache = SemanticCache({"roadmap"})
+    cache.put("roadmap", "model", conversation("python", "what should I learn next"), "pandas", "groq")
+
+    assert cache.get("roadmap", "model", conversation("python", "What should I learn next?"))["text"] == "pandas"
+    assert cache.get("roadmap", "model", conversation("java", "what should I learn next")) is None
+    assert cache.get("roadmap", "model", prompt("what should I learn next")) is None
+    assert cache_key("roadmap", "model", conversation("python", "next")) != cache_key(
+        "roadmap", "model", conversation("java", "next")
+    )